@@ -1,11 +1,40 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import logging
+from uuid import uuid4
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncConnection, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.config import settings
 
+logger = logging.getLogger("auvia.database")
+
 # Convert sync URL to async URL
 database_url = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
 
-engine = create_async_engine(database_url, echo=False)
+if settings.db_pgbouncer:
+    # Transaction pooling hands each transaction to any server connection, so
+    # prepared statements can't be cached per connection and need unique names.
+    # PgBouncer also rejects unknown startup parameters such as jit.
+    connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+else:
+    # Our queries are short OLTP lookups; JIT compilation only adds planning latency
+    connect_args = {"server_settings": {"jit": "off"}}
+
+# Explicit pool sizing so concurrent download workers, background tasks and
+# requests don't stall on connection checkout; pre-ping drops dead connections
+engine = create_async_engine(
+    database_url,
+    echo=False,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
+    connect_args=connect_args
+)
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -21,6 +50,144 @@ async def get_db():
             await session.close()
 
 
+def get_pool_stats() -> dict:
+    """Connection pool usage, for spotting checkout pressure and leaks"""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # QueuePool counts overflow from -size until the pool has filled
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+    }
+
+
+def _dedupe_active_downloads(sync_conn) -> int:
+    """Keep the newest active download per URL; older duplicates are failed"""
+    return sync_conn.execute(text("""
+        UPDATE download_tasks
+        SET status = 'failed', error_message = 'Duplicate of a newer download'
+        WHERE status IN ('pending', 'downloading')
+        AND id NOT IN (
+            SELECT max(id) FROM download_tasks
+            WHERE status IN ('pending', 'downloading')
+            GROUP BY qobuz_url
+        )
+    """)).rowcount
+
+
+def _dedupe_track_file_paths(sync_conn) -> int:
+    """
+    Merge tracks sharing a file into one, preferring the row with a qobuz_id.
+    Queue items, likes and play history move to the kept track; the others are deleted.
+    """
+    sync_conn.execute(text("""
+        CREATE TEMP TABLE track_dupes ON COMMIT DROP AS
+        SELECT id, first_value(id) OVER (
+            PARTITION BY file_path ORDER BY (qobuz_id IS NOT NULL) DESC, id
+        ) AS keep_id
+        FROM tracks
+        WHERE file_path IS NOT NULL
+    """))
+    sync_conn.execute(text("DELETE FROM track_dupes WHERE id = keep_id"))
+    
+    for table in ("queue", "play_history"):
+        sync_conn.execute(text(f"""
+            UPDATE {table} SET track_id = d.keep_id
+            FROM track_dupes d WHERE {table}.track_id = d.id
+        """))
+    # liked_tracks.track_id is unique - keep one like per kept track
+    sync_conn.execute(text("""
+        DELETE FROM liked_tracks
+        WHERE id NOT IN (
+            SELECT min(l.id) FROM liked_tracks l
+            LEFT JOIN track_dupes d ON d.id = l.track_id
+            GROUP BY coalesce(d.keep_id, l.track_id)
+        )
+    """))
+    sync_conn.execute(text("""
+        UPDATE liked_tracks SET track_id = d.keep_id
+        FROM track_dupes d WHERE liked_tracks.track_id = d.id
+    """))
+    sync_conn.execute(text("""
+        UPDATE tracks SET
+            play_count = coalesce(tracks.play_count, 0) + merged.play_count,
+            last_played = greatest(tracks.last_played, merged.last_played),
+            is_downloaded = coalesce(tracks.is_downloaded, false) OR merged.is_downloaded
+        FROM (
+            SELECT
+                d.keep_id,
+                sum(coalesce(t.play_count, 0)) AS play_count,
+                max(t.last_played) AS last_played,
+                coalesce(bool_or(t.is_downloaded), false) AS is_downloaded
+            FROM track_dupes d JOIN tracks t ON t.id = d.id
+            GROUP BY d.keep_id
+        ) merged
+        WHERE tracks.id = merged.keep_id
+    """))
+    return sync_conn.execute(text("DELETE FROM tracks USING track_dupes WHERE tracks.id = track_dupes.id")).rowcount
+
+
+# Clean-ups for rows that would violate a unique index added to an existing
+# table, run just before that index is created. Each returns the rows changed
+_INDEX_DEDUPES = {
+    "uq_download_tasks_active_url": _dedupe_active_downloads,
+    "ix_tracks_file_path": _dedupe_track_file_paths,
+}
+
+
+def _add_missing_columns(sync_conn):
+    """
+    Add columns and indexes that were introduced after a table was first created.
+    create_all() only creates missing tables, so new nullable columns on existing
+    tables are added here.
+    """
+    inspector = inspect(sync_conn)
+    existing_tables = set(inspector.get_table_names())
+    
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        
+        existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {column_type}'))
+        
+        existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            if index.name in _INDEX_DEDUPES:
+                changed = _INDEX_DEDUPES[index.name](sync_conn)
+                if changed:
+                    logger.warning("Resolved %d duplicate rows before creating index %s", changed, index.name)
+            # A savepoint keeps one failing index from aborting the whole startup transaction
+            try:
+                with sync_conn.begin_nested():
+                    index.create(sync_conn, checkfirst=True)
+            except Exception as e:
+                print(f"Could not create index {index.name}: {e}")
+
+
+async def warm_db_pool(count: int = settings.db_pool_size):
+    """Open pooled connections up front so the first requests don't pay connection setup"""
+    # Check all connections out at once so each one is a new connection, then return them
+    connections = await asyncio.gather(
+        *(engine.connect().start() for _ in range(count)),
+        return_exceptions=True
+    )
+    for conn in connections:
+        if isinstance(conn, AsyncConnection):
+            await conn.close()
+        else:
+            print(f"Database pool warm-up error: {conn}")
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
@@ -0,0 +1,48 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.config import settings
+
+# Records waiting to be written; when full (stdout stalled) new records are dropped
+LOG_QUEUE_SIZE = 10000
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the caller, even when the queue is full"""
+    
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def setup_logging():
+    """Route 'auvia.*' loggers through a queue so writing happens on a background thread"""
+    global _listener
+    if _listener is not None:
+        return
+    
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    
+    logger = logging.getLogger("auvia")
+    logger.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    logger.addHandler(_DroppingQueueHandler(log_queue))
+    logger.propagate = False
+
+
+def shutdown_logging():
+    """Flush pending log records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
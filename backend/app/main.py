@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -5,14 +6,24 @@ from fastapi.staticfiles import StaticFiles
 import os
 
 from app.config import settings
-from app.database import init_db
+from app.database import init_db, warm_db_pool
+from app.logging_config import setup_logging, shutdown_logging
+from app.services.cache import init_redis, close_redis
 from app.routers import auth, music, admin, queue, search, likes
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    setup_logging()
+    
+    # Connect to Qobuz in the background while the rest of startup runs
+    from app.services.qobuz import warm_http_client, close_http_client
+    qobuz_warmer = asyncio.create_task(warm_http_client())
+    
     await init_db()
+    await warm_db_pool()
+    await init_redis()
     
     # Initialize default storage locations if none exist
     from app.database import async_session_maker
@@ -20,8 +31,8 @@ async def lifespan(app: FastAPI):
     from sqlalchemy import select
     
     async with async_session_maker() as db:
-        result = await db.execute(select(StorageLocation))
-        if not result.scalars().first():
+        result = await db.execute(select(StorageLocation.id).limit(1))
+        if result.scalar() is None:
             # Add default storage locations
             default_locations = [
                 StorageLocation(
@@ -51,12 +62,31 @@ async def lifespan(app: FastAPI):
     from app.services.music import MusicService
     async with async_session_maker() as db:
         music_service = MusicService(db)
+        backfilled = await music_service.backfill_normalized_names()
+        if backfilled:
+            print(f"Backfilled normalized names for {backfilled} rows")
         stats = await music_service.verify_local_files()
         print(f"Startup file verification: {stats}")
     
+    # Keep popular search queries warm in the cache
+    search_warmer = asyncio.create_task(search.warm_search_cache())
+    
+    # Start the bounded download worker pool
+    from app.services.download import start_download_workers, stop_download_workers
+    start_download_workers()
+    
     yield
     # Shutdown
-    pass
+    stop_download_workers()
+    from app.services.music import shutdown_metadata_pool
+    shutdown_metadata_pool()
+    search_warmer.cancel()
+    qobuz_warmer.cancel()
+    await close_http_client()
+    from app.services.streamrip import close_rip_workers
+    await close_rip_workers()
+    await close_redis()
+    shutdown_logging()
 
 
 app = FastAPI(
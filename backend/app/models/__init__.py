@@ -1,5 +1,5 @@
 from app.models.user import User
-from app.models.music import Artist, Album, Track, PlayHistory, QueueItem, DownloadTask
+from app.models.music import Artist, Album, Track, PlayHistory, ScanCacheEntry, QueueItem, DownloadTask
 from app.models.settings import AppSettings, StorageLocation, QobuzConfig
 
 __all__ = [
@@ -8,6 +8,7 @@ __all__ = [
     "Album", 
     "Track",
     "PlayHistory",
+    "ScanCacheEntry",
     "QueueItem",
     "DownloadTask",
     "AppSettings",
@@ -1,14 +1,27 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float
-from sqlalchemy.orm import relationship
+import re
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Text, Float, Index, text
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from app.database import Base
 
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+
+
+def normalize_title(title: str) -> str:
+    """Normalize title for comparison - lowercase, remove special chars"""
+    if not title:
+        return ""
+    # Lowercase and remove special characters, extra spaces
+    normalized = _NON_WORD_RE.sub('', title.lower())
+    return ' '.join(normalized.split())
+
 
 class Artist(Base):
     __tablename__ = "artists"
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)
+    name_normalized = Column(String(255), nullable=True, index=True)
     qobuz_id = Column(String(100), unique=True, nullable=True, index=True)
     image_url = Column(Text, nullable=True)
     bio = Column(Text, nullable=True)
@@ -16,6 +29,11 @@ class Artist(Base):
     
     albums = relationship("Album", back_populates="artist")
     tracks = relationship("Track", back_populates="artist")
+    
+    @validates("name")
+    def _set_name_normalized(self, key, value):
+        self.name_normalized = normalize_title(value)
+        return value
 
 
 class Album(Base):
@@ -23,6 +41,7 @@ class Album(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
+    title_normalized = Column(String(255), nullable=True, index=True)
     artist_id = Column(Integer, ForeignKey("artists.id"), nullable=False)
     qobuz_id = Column(String(100), unique=True, nullable=True, index=True)
     qobuz_url = Column(Text, nullable=True)
@@ -39,6 +58,20 @@ class Album(Base):
     
     artist = relationship("Artist", back_populates="albums")
     tracks = relationship("Track", back_populates="album")
+    
+    __table_args__ = (
+        # Recently added albums: newest downloaded first, read straight off the index
+        Index(
+            "ix_albums_downloaded_created_at",
+            "created_at",
+            postgresql_where=text("is_downloaded = true")
+        ),
+    )
+    
+    @validates("title")
+    def _set_title_normalized(self, key, value):
+        self.title_normalized = normalize_title(value)
+        return value
 
 
 class Track(Base):
@@ -46,6 +79,7 @@ class Track(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False, index=True)
+    title_normalized = Column(String(255), nullable=True, index=True)
     artist_id = Column(Integer, ForeignKey("artists.id"), nullable=False)
     album_id = Column(Integer, ForeignKey("albums.id"), nullable=False)
     qobuz_id = Column(String(100), unique=True, nullable=True, index=True)
@@ -60,6 +94,17 @@ class Track(Base):
     
     artist = relationship("Artist", back_populates="tracks")
     album = relationship("Album", back_populates="tracks")
+    
+    __table_args__ = (
+        # Library scans look tracks up by file path, then by album position
+        Index("ix_tracks_file_path", "file_path", unique=True),
+        Index("ix_tracks_album_id_track_number", "album_id", "track_number"),
+    )
+    
+    @validates("title")
+    def _set_title_normalized(self, key, value):
+        self.title_normalized = normalize_title(value)
+        return value
 
 
 class PlayHistory(Base):
@@ -71,6 +116,23 @@ class PlayHistory(Base):
     played_duration = Column(Integer, nullable=True)  # How much was played in seconds
     
     track = relationship("Track")
+    
+    __table_args__ = (
+        # Latest play per track for the recently played list
+        Index("ix_play_history_track_id_played_at", "track_id", "played_at"),
+        # Play history, newest first
+        Index("ix_play_history_played_at", "played_at"),
+    )
+
+
+class ScanCacheEntry(Base):
+    """(mtime, size) of each file as of the library scan that last read it"""
+    __tablename__ = "scan_cache"
+    
+    path = Column(Text, primary_key=True)
+    mtime_ns = Column(BigInteger, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    last_seen = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class QueueItem(Base):
@@ -85,6 +147,11 @@ class QueueItem(Base):
     track = relationship("Track")
 
 
+ACTIVE_DOWNLOAD_STATUSES = ("pending", "downloading")
+# Literal SQL so Postgres can match ON CONFLICT inference against the partial index
+ACTIVE_DOWNLOAD_PREDICATE = text("status IN ('pending', 'downloading')")
+
+
 class DownloadTask(Base):
     __tablename__ = "download_tasks"
     
@@ -97,6 +164,27 @@ class DownloadTask(Base):
     error_message = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    # When a worker set the task downloading; stale claims are picked up again
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Playback requested with the download, applied by whichever worker completes it
+    play_track_id = Column(String(100), nullable=True)
+    play_track_title = Column(String(255), nullable=True)
+    play_track_number = Column(Integer, nullable=True)
+    play_now = Column(Boolean, nullable=True, default=False)
+    play_next = Column(Boolean, nullable=True, default=False)
+    
+    __table_args__ = (
+        # At most one active download per URL
+        Index(
+            "uq_download_tasks_active_url",
+            "qobuz_url",
+            unique=True,
+            postgresql_where=ACTIVE_DOWNLOAD_PREDICATE
+        ),
+        # Status filters with an age cutoff (cleanup of old finished tasks)
+        Index("ix_download_tasks_status_created_at", "status", "created_at"),
+    )
 
 
 class LikedTrack(Base):
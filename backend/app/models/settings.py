@@ -26,6 +26,10 @@ class StorageLocation(Base):
     free_space = Column(String(50), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Fetch server-generated timestamps with RETURNING on insert/update,
+    # so the API response can be built without a refresh() round-trip
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class QobuzConfig(Base):
@@ -41,3 +45,5 @@ class QobuzConfig(Base):
     secrets = Column(JSON, nullable=True)  # List of secrets
     is_configured = Column(Boolean, default=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __mapper_args__ = {"eager_defaults": True}
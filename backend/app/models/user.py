@@ -14,3 +14,6 @@ class User(Base):
     pin = Column(String(10), nullable=True)  # Optional PIN for quick admin access
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Fetch server-generated timestamps with RETURNING on insert/update
+    __mapper_args__ = {"eager_defaults": True}
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Optional
+
+# Long-lived streamrip process started by StreamripService (python -m app.rip_worker),
+# so streamrip is imported once per worker instead of once per download.
+# Kept outside app.services, whose __init__ pulls in the whole backend (database
+# engine, SQLAlchemy, mutagen...) - this module must not import anything from app.
+#
+# Jobs arrive one JSON object per line on stdin:
+#   {"action": "download", "config_path": ..., "urls": [...], "folder": ..., "quality": null | 1-4}
+#   {"action": "login", "config_path": ...}
+# and each gets one JSON line back on stdout:
+#   {"ok": true | false, "error": null | "message"}
+# Jobs run one at a time; StreamripService starts more workers for concurrent downloads.
+
+logger = logging.getLogger("auvia.rip_worker")
+
+# Logged-in Qobuz client kept across jobs while the credentials stay the same,
+# so back-to-back downloads skip the login round trips. Jobs run one at a
+# time on this loop, so no lock is needed around it
+_client = None
+_client_key: Optional[tuple] = None
+
+
+def _load_config(config_path: str):
+    """Load the shared streamrip config, upgrading an outdated file like `rip` does"""
+    from streamrip.config import Config, OutdatedConfigError
+    
+    try:
+        config = Config(config_path)
+    except OutdatedConfigError:
+        Config.update_file(config_path)
+        config = Config(config_path)
+    
+    # Logging in must never fall back to streamrip's interactive prompt -
+    # stdin is the job channel
+    qobuz = config.session.qobuz
+    if not qobuz.email_or_userid or not qobuz.password_or_token:
+        raise RuntimeError("Qobuz credentials are not configured")
+    return config
+
+
+async def _download(job: dict) -> None:
+    """Download job["urls"] like `rip -ndb --folder ... [--quality ...] url ...`"""
+    config = _load_config(job["config_path"])
+    
+    # Per-job settings only change this session's copy, never the file.
+    # Skip streamrip's own database so re-downloads always happen, and
+    # leave progress bars out of the logs (like --no-progress)
+    session = config.session
+    session.database.downloads_enabled = False
+    session.cli.progress_bars = False
+    session.downloads.folder = job["folder"]
+    if job.get("quality") is not None:
+        session.qobuz.quality = job["quality"]
+    
+    reused = _client is not None and _client_key == _credentials_key(config)
+    try:
+        await _rip(config, await _logged_in_client(config), job["urls"])
+    except Exception as e:
+        if not reused:
+            raise
+        # The kept session may have expired - log in again and retry once
+        logger.warning("Retrying with a fresh Qobuz login: %s", e)
+        await _rip(config, await _logged_in_client(config, fresh=True), job["urls"])
+
+
+async def _rip(config, client, urls) -> None:
+    """Resolve and download urls with an already logged-in client"""
+    from streamrip.media import remove_artwork_tempdirs
+    from streamrip.progress import clear_progress
+    from streamrip.rip.main import Main
+    
+    main = Main(config)
+    main.clients["qobuz"] = client
+    try:
+        await main.add_all(urls)
+        await main.resolve()
+        await main.rip()
+    finally:
+        # Main's own cleanup, except closing the kept client's session
+        clear_progress()
+        remove_artwork_tempdirs()
+
+
+def _credentials_key(config) -> tuple:
+    qobuz = config.session.qobuz
+    return (
+        qobuz.email_or_userid,
+        qobuz.password_or_token,
+        qobuz.use_auth_token,
+        str(qobuz.app_id),
+        tuple(qobuz.secrets)
+    )
+
+
+async def _close_client() -> None:
+    global _client, _client_key
+    if _client is not None and hasattr(_client, "session"):
+        await _client.session.close()
+    _client = _client_key = None
+
+
+async def _logged_in_client(config, fresh: bool = False):
+    """The kept client, logging in again if the credentials changed (or fresh is set)"""
+    from streamrip.client import QobuzClient
+    global _client, _client_key
+    
+    key = _credentials_key(config)
+    if fresh or _client is None or _client_key != key:
+        await _close_client()
+        client = QobuzClient(config)
+        try:
+            await client.login()
+        except BaseException:
+            if hasattr(client, "session"):
+                await client.session.close()
+            raise
+        _client, _client_key = client, key
+    return _client
+
+
+async def _login(job: dict) -> None:
+    """Log in to Qobuz with the configured credentials; raises if they are rejected"""
+    # Always a real login, which then serves the following downloads
+    await _logged_in_client(_load_config(job["config_path"]), fresh=True)
+
+
+_ACTIONS = {"download": _download, "login": _login}
+
+
+async def _serve(replies) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            # Parent closed stdin - shut down
+            await _close_client()
+            return
+        
+        try:
+            job = json.loads(line)
+            await _ACTIONS[job["action"]](job)
+            reply = {"ok": True, "error": None}
+        except Exception as e:
+            logger.exception("Streamrip job failed")
+            reply = {"ok": False, "error": str(e)}
+        
+        replies.write(json.dumps(reply) + "\n")
+        replies.flush()
+
+
+def main() -> None:
+    # streamrip prints progress to stdout - keep that off the reply channel
+    # by sending fd 1 to stderr and replying on a private copy of the original
+    replies = os.fdopen(os.dup(1), "w")
+    os.dup2(2, 1)
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    
+    # Import up front so the cost is paid before the first job arrives
+    import streamrip.rip.main  # noqa: F401
+    
+    asyncio.run(_serve(replies))
+
+
+if __name__ == "__main__":
+    main()
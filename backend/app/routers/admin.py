@@ -4,7 +4,7 @@ from sqlalchemy import select, func
 import shutil
 import os
 
-from app.database import get_db
+from app.database import get_db, get_pool_stats
 from app.models.user import User
 from app.models.music import Album, Track, Artist
 from app.models.settings import QobuzConfig, StorageLocation, AppSettings
@@ -15,6 +15,7 @@ from app.schemas.settings import (
 )
 from app.services.auth import get_current_admin_user
 from app.services.streamrip import StreamripService
+from app.services.download import DownloadService
 from app.services.cache import cache_clear_pattern
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -28,15 +29,15 @@ async def get_system_status(
     """Get overall system status"""
     # Check for admin
     admin_result = await db.execute(
-        select(User).where(User.is_admin == True)
+        select(User.id).where(User.is_admin == True).limit(1)
     )
-    has_admin = admin_result.scalar_one_or_none() is not None
+    has_admin = admin_result.scalar() is not None
     
     # Check for Qobuz config
     qobuz_result = await db.execute(
-        select(QobuzConfig).where(QobuzConfig.is_configured == True)
+        select(QobuzConfig.id).where(QobuzConfig.is_configured == True).limit(1)
     )
-    has_qobuz = qobuz_result.scalar_one_or_none() is not None
+    has_qobuz = qobuz_result.scalar() is not None
     
     # Get storage locations
     storage_result = await db.execute(select(StorageLocation))
@@ -140,7 +141,7 @@ async def save_qobuz_config(
         db.add(config)
     
     await db.commit()
-    await db.refresh(config)
+    DownloadService.invalidate_settings_cache()
     
     # Update streamrip config file
     streamrip_service = StreamripService()
@@ -247,7 +248,7 @@ async def add_storage_location(
     )
     db.add(location)
     await db.commit()
-    await db.refresh(location)
+    DownloadService.invalidate_settings_cache()
     
     return StorageLocationResponse.model_validate(location)
 
@@ -280,7 +281,7 @@ async def update_storage_location(
     location.is_primary = location_data.is_primary
     
     await db.commit()
-    await db.refresh(location)
+    DownloadService.invalidate_settings_cache()
     
     return StorageLocationResponse.model_validate(location)
 
@@ -302,6 +303,7 @@ async def delete_storage_location(
     
     await db.delete(location)
     await db.commit()
+    DownloadService.invalidate_settings_cache()
     
     return {"message": "Storage location deleted"}
 
@@ -377,6 +379,14 @@ async def clear_cache(
     return {"message": f"Cleared {total} cached items", "count": total}
 
 
+@router.get("/db-pool")
+async def db_pool_stats(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Database connection pool usage"""
+    return get_pool_stats()
+
+
 @router.post("/verify-files")
 async def verify_files(
     db: AsyncSession = Depends(get_db),
@@ -402,7 +412,7 @@ async def rebuild_library(
     This deletes ALL music data (tracks, albums, artists, queue, history) and re-scans from disk.
     Use this when the database is out of sync with files on disk.
     """
-    from app.models.music import Track, Album, Artist, QueueItem, PlayHistory, DownloadTask
+    from app.models.music import Track, Album, Artist, QueueItem, PlayHistory, DownloadTask, ScanCacheEntry
     from app.services.music import MusicService
     
     # Delete all music-related data in correct order (foreign key constraints)
@@ -412,6 +422,7 @@ async def rebuild_library(
     await db.execute(delete(Track))
     await db.execute(delete(Album))
     await db.execute(delete(Artist))
+    await db.execute(delete(ScanCacheEntry))
     await db.commit()
     
     # Clear caches
@@ -18,15 +18,15 @@ async def check_setup_status(db: AsyncSession = Depends(get_db)):
     """Check if initial setup is complete"""
     # Check for admin user
     admin_result = await db.execute(
-        select(User).where(User.is_admin == True)
+        select(User.id).where(User.is_admin == True).limit(1)
     )
-    has_admin = admin_result.scalar_one_or_none() is not None
+    has_admin = admin_result.scalar() is not None
     
     # Check for Qobuz config
     qobuz_result = await db.execute(
-        select(QobuzConfig).where(QobuzConfig.is_configured == True)
+        select(QobuzConfig.id).where(QobuzConfig.is_configured == True).limit(1)
     )
-    has_qobuz = qobuz_result.scalar_one_or_none() is not None
+    has_qobuz = qobuz_result.scalar() is not None
     
     return SetupCheck(
         is_setup_complete=has_admin and has_qobuz,
@@ -58,7 +58,6 @@ async def initial_setup(user_data: UserCreate, db: AsyncSession = Depends(get_db
     )
     db.add(admin_user)
     await db.commit()
-    await db.refresh(admin_user)
     
     # Create token
     access_token = create_access_token(data={"sub": admin_user.username})
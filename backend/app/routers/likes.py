@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 from typing import List
 
 from app.database import get_db
@@ -25,8 +25,8 @@ async def get_liked_tracks(db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(LikedTrack)
         .options(
-            selectinload(LikedTrack.track).selectinload(Track.album),
-            selectinload(LikedTrack.track).selectinload(Track.artist)
+            joinedload(LikedTrack.track).joinedload(Track.album),
+            joinedload(LikedTrack.track).joinedload(Track.artist)
         )
         .order_by(desc(LikedTrack.liked_at))
     )
@@ -59,7 +59,7 @@ async def get_liked_albums(db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(LikedAlbum)
         .options(
-            selectinload(LikedAlbum.album).selectinload(Album.artist)
+            joinedload(LikedAlbum.album).joinedload(Album.artist)
         )
         .order_by(desc(LikedAlbum.liked_at))
     )
@@ -130,9 +130,9 @@ async def unlike_track(track_id: int, db: AsyncSession = Depends(get_db)):
 async def get_track_like_status(track_id: int, db: AsyncSession = Depends(get_db)):
     """Check if a track is liked"""
     result = await db.execute(
-        select(LikedTrack).where(LikedTrack.track_id == track_id)
+        select(LikedTrack.id).where(LikedTrack.track_id == track_id).limit(1)
     )
-    liked = result.scalar_one_or_none()
+    liked = result.scalar()
     
     return {"track_id": track_id, "is_liked": liked is not None}
 
@@ -183,9 +183,9 @@ async def unlike_album(album_id: int, db: AsyncSession = Depends(get_db)):
 async def get_album_like_status(album_id: int, db: AsyncSession = Depends(get_db)):
     """Check if an album is liked"""
     result = await db.execute(
-        select(LikedAlbum).where(LikedAlbum.album_id == album_id)
+        select(LikedAlbum.id).where(LikedAlbum.album_id == album_id).limit(1)
     )
-    liked = result.scalar_one_or_none()
+    liked = result.scalar()
     
     return {"album_id": album_id, "is_liked": liked is not None}
 
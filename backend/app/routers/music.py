@@ -3,13 +3,13 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request, Backgrou
 from fastapi.responses import FileResponse, StreamingResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, joinedload
 from typing import List, Optional
 import os
 import aiofiles
 
 from app.database import get_db
-from app.models.music import Album, Track, Artist, PlayHistory
+from app.models.music import Album, Track, Artist, PlayHistory, normalize_title
 from app.models.settings import AppSettings
 from app.schemas.music import (
     AlbumResponse, TrackResponse, ArtistResponse, 
@@ -110,13 +110,6 @@ async def get_album_by_qobuz_id(
     db: AsyncSession = Depends(get_db)
 ):
     """Get album by Qobuz ID - used for polling after download"""
-    import re
-    
-    def normalize(s):
-        if not s:
-            return ""
-        return ' '.join(re.sub(r'[^\w\s]', '', s.lower()).split())
-    
     # First trigger a quick scan to pick up newly downloaded files
     music_service = MusicService(db)
     await music_service.scan_directory("/music")
@@ -133,21 +126,21 @@ async def get_album_by_qobuz_id(
     if not album and title and artist:
         result = await db.execute(
             select(Album)
+            .join(Artist, Album.artist_id == Artist.id)
             .options(selectinload(Album.artist), selectinload(Album.tracks))
-            .where(Album.is_downloaded == True)
+            .where(
+                Album.is_downloaded == True,
+                Album.title_normalized == normalize_title(title),
+                Artist.name_normalized == normalize_title(artist)
+            )
+            .limit(1)
         )
-        all_albums = result.scalars().all()
-        
-        norm_title = normalize(title)
-        norm_artist = normalize(artist)
+        album = result.scalar_one_or_none()
         
-        for a in all_albums:
-            if normalize(a.title) == norm_title and normalize(a.artist.name) == norm_artist:
-                album = a
-                # Update the qobuz_id for future lookups
-                album.qobuz_id = qobuz_id
-                await db.commit()
-                break
+        if album:
+            # Update the qobuz_id for future lookups
+            album.qobuz_id = qobuz_id
+            await db.commit()
     
     if not album:
         return {"found": False, "album": None}
@@ -459,8 +452,8 @@ async def get_play_history(
     result = await db.execute(
         select(PlayHistory)
         .options(
-            selectinload(PlayHistory.track).selectinload(Track.artist),
-            selectinload(PlayHistory.track).selectinload(Track.album)
+            joinedload(PlayHistory.track).joinedload(Track.artist),
+            joinedload(PlayHistory.track).joinedload(Track.album)
         )
         .order_by(desc(PlayHistory.played_at))
         .offset((page - 1) * limit)
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, delete, func, insert
+from sqlalchemy.orm import selectinload, joinedload
 from typing import List
 from datetime import datetime
 
@@ -11,7 +12,7 @@ from app.schemas.music import (
     QueueItemResponse, TrackResponse, AddToQueueRequest, 
     PlayAlbumRequest, DownloadRequest, DownloadTaskResponse
 )
-from app.services.download import DownloadService
+from app.services.download import DownloadService, subscribe_download_status, unsubscribe_download_status
 
 router = APIRouter(prefix="/queue", tags=["Queue"])
 
@@ -22,8 +23,8 @@ async def get_queue(db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(QueueItem)
         .options(
-            selectinload(QueueItem.track).selectinload(Track.artist),
-            selectinload(QueueItem.track).selectinload(Track.album)
+            joinedload(QueueItem.track).joinedload(Track.artist),
+            joinedload(QueueItem.track).joinedload(Track.album)
         )
         .order_by(QueueItem.position)
     )
@@ -198,13 +199,15 @@ async def play_album(
     await db.execute(delete(QueueItem))
     
     # Add all tracks
-    for i, track in enumerate(tracks):
-        queue_item = QueueItem(
-            track_id=track.id,
-            position=i + 1,
-            is_playing=(i == request.start_track - 1)
-        )
-        db.add(queue_item)
+    if tracks:
+        await db.execute(insert(QueueItem), [
+            {
+                "track_id": track.id,
+                "position": i + 1,
+                "is_playing": i == request.start_track - 1
+            }
+            for i, track in enumerate(tracks)
+        ])
     
     await db.commit()
     
@@ -373,8 +376,8 @@ async def get_now_playing(db: AsyncSession = Depends(get_db)):
     result = await db.execute(
         select(QueueItem)
         .options(
-            selectinload(QueueItem.track).selectinload(Track.artist),
-            selectinload(QueueItem.track).selectinload(Track.album)
+            joinedload(QueueItem.track).joinedload(Track.artist),
+            joinedload(QueueItem.track).joinedload(Track.album)
         )
         .where(QueueItem.is_playing == True)
     )
@@ -412,6 +415,44 @@ async def get_download_tasks(db: AsyncSession = Depends(get_db)):
     return [DownloadTaskResponse.model_validate(task) for task in tasks]
 
 
+@router.websocket("/downloads/ws")
+async def download_status_ws(websocket: WebSocket):
+    """Push download task status changes as they happen"""
+    await websocket.accept()
+    updates = subscribe_download_status()
+    
+    async def forward_updates():
+        while True:
+            event = await updates.get()
+            if event is None:
+                # Fell too far behind - close so the client resyncs from GET /downloads
+                await websocket.close(code=1013)
+                return
+            await websocket.send_json(event)
+    
+    async def wait_for_disconnect():
+        # Clients don't send anything; this only returns once they disconnect
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+    
+    sender = asyncio.create_task(forward_updates())
+    receiver = asyncio.create_task(wait_for_disconnect())
+    try:
+        # A disconnect, an overflow or a failed send each end the connection
+        await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        sender.cancel()
+        receiver.cancel()
+        unsubscribe_download_status(updates)
+    
+    for task in (sender, receiver):
+        if task.done() and not task.cancelled() and task.exception():
+            print(f"Download status socket error: {task.exception()}")
+
+
 def format_duration(seconds: int | None) -> str:
     """Format duration in seconds to MM:SS"""
     if not seconds:
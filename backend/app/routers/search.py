@@ -1,22 +1,66 @@
-from fastapi import APIRouter, Depends, Query
+import asyncio
+import hashlib
+import logging
+import re
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from rapidfuzz import fuzz, process
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
-from sqlalchemy.orm import selectinload
-from typing import List
+from sqlalchemy.orm import contains_eager
+from typing import Dict, List
 
 from app.database import get_db
-from app.models.music import Album, Track, Artist
+from app.models.music import Album, Track, Artist, normalize_title
 from app.schemas.music import SearchResult, AlbumResponse, TrackResponse, ArtistResponse
 from app.services.qobuz import QobuzService
-from app.services.cache import cache_get, cache_set
+from app.services.cache import cache_get, cache_set, cache_ttl, cache_incr_score, cache_top_members
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
+logger = logging.getLogger("auvia.search")
+
 SEARCH_CACHE_TTL = 300  # 5 minutes
+SEARCH_BROWSER_CACHE_CONTROL = "private, max-age=30"
+
+# Popular query tracking for the background cache warmer. Kept outside the
+# search_qobuz: namespace so it can never collide with a query's cache key.
+SEARCH_FREQ_KEY = "search_qobuz_freq"
+SEARCH_FREQ_TTL = 7 * 24 * 3600  # 1 week
+SEARCH_WARM_INTERVAL = 60  # seconds
+SEARCH_WARM_TOP_N = 100
+# Popularity updates in flight; they run off the request path, this keeps them referenced
+_search_count_tasks: set = set()
+
+# Prebuilt serializers for list responses - one compiled dump per response
+# instead of FastAPI validating and serializing each item
+_ALBUM_LIST_ADAPTER = TypeAdapter(List[AlbumResponse])
+_TRACK_LIST_ADAPTER = TypeAdapter(List[TrackResponse])
+_ARTIST_LIST_ADAPTER = TypeAdapter(List[ArtistResponse])
+
+# In-flight search per client; a newer search from the same client supersedes it
+_inflight_searches: Dict[str, asyncio.Task] = {}
+
+# Minimum rapidfuzz scores (0-100) for a remote album to count as a local duplicate
+FUZZY_TITLE_CUTOFF = 90
+FUZZY_ARTIST_CUTOFF = 90
+
+# Title words that mark another edition of the same album rather than a different album
+EDITION_WORDS = {
+    "remaster", "remastered", "remasters", "deluxe", "expanded", "edition",
+    "anniversary", "version", "bonus", "tracks", "special", "collectors",
+    "limited", "reissue", "digitally", "super"
+}
+# Years and ordinals ("2011 remaster", "40th anniversary") only count with an edition word
+_EDITION_NUMBER_RE = re.compile(r'^(?:\d{4}|\d+(?:st|nd|rd|th))$')
+# Tokens that tell sequels and volumes apart ("led zeppelin ii", "greatest hits 2")
+_SEQUEL_TOKEN_RE = re.compile(r'^(?:\d+|[ivx]+)$')
 
 
 @router.get("", response_model=SearchResult)
 async def search(
+    request: Request,
     q: str = Query(..., min_length=1, description="Search query"),
     include_remote: bool = Query(True, description="Include results from Qobuz API"),
     db: AsyncSession = Depends(get_db)
@@ -24,49 +68,168 @@ async def search(
     """
     Search for music across local library and Qobuz.
     Results are returned as the user types for instant feedback.
+    A newer search from the same client cancels the Qobuz lookup still in flight.
     """
     query = q.strip().lower()
     
-    # Search local database
-    local_albums = await search_local_albums(db, query)
-    local_tracks = await search_local_tracks(db, query)
-    local_artists = await search_local_artists(db, query)
+    client_key = get_client_key(request)
+    previous = _inflight_searches.get(client_key)
+    if previous and not previous.done():
+        previous.cancel()
+    
+    # Only the Qobuz leg is cancellable. The local queries are fast, and cancelling
+    # one mid-query makes asyncpg open another connection to send the cancel
+    task = asyncio.create_task(search_remote(query, include_remote))
+    _inflight_searches[client_key] = task
+    try:
+        local_albums = await search_local_albums(db, query)
+        local_tracks = await search_local_tracks(db, query)
+        local_artists = await search_local_artists(db, query)
+        remote_results = await task
+    except asyncio.CancelledError:
+        if asyncio.current_task().cancelling():
+            raise
+        # Superseded by a newer keystroke - nothing to return
+        return Response(status_code=204)
+    finally:
+        if _inflight_searches.get(client_key) is task:
+            del _inflight_searches[client_key]
+        task.cancel()
+    
+    # Merge results, prioritizing local (downloaded) content
+    result = SearchResult(
+        query=q,
+        albums=merge_album_results(local_albums, remote_results.get("albums", []), cap=20),
+        tracks=merge_track_results(local_tracks, remote_results.get("tracks", []), cap=20),
+        artists=merge_artist_results(local_artists, remote_results.get("artists", []), cap=10)
+    )
+    
+    # Repeated identical searches (user pausing while typing) get a bodyless 304
+    body = result.model_dump_json()
+    etag = f'"{hashlib.blake2b(body.encode(), digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": SEARCH_BROWSER_CACHE_CONTROL}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def get_client_key(request: Request) -> str:
+    """Identify the client behind the frontend proxy for search coalescing"""
+    real_ip = request.headers.get("x-real-ip")
+    if real_ip:
+        return real_ip
+    return request.client.host if request.client else "unknown"
+
+
+async def search_remote(query: str, include_remote: bool) -> dict:
+    """Qobuz results for a search, from cache when possible"""
+    if not include_remote:
+        return {}
+    
+    count_search(query)
+    
+    cached_results = await cache_get(f"search_qobuz:{query}")
+    if cached_results:
+        return cached_results
+    return await fetch_remote_results(query)
+
+
+def count_search(query: str):
+    """Count a remote search for the cache warmer, without holding up the response"""
+    task = asyncio.create_task(cache_incr_score(SEARCH_FREQ_KEY, query, expire=SEARCH_FREQ_TTL))
+    _search_count_tasks.add(task)
+    task.add_done_callback(_search_count_tasks.discard)
+
+
+async def fetch_remote_results(query: str, refresh: bool = False) -> dict:
+    """Search Qobuz and cache the results (refresh=True skips cached API responses)"""
+    qobuz_service = await QobuzService.create()
+    remote_results = await qobuz_service.search(query, refresh=refresh)
+    await cache_set(f"search_qobuz:{query}", remote_results, SEARCH_CACHE_TTL)
+    return remote_results
+
+
+@router.get("/stream")
+async def search_stream(
+    q: str = Query(..., min_length=1, description="Search query"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Search like GET /search, streamed as server-sent events so each section can
+    render as soon as it is ready: local results first, then each Qobuz category
+    as it arrives, merged with the local ones. Each "albums", "tracks" or
+    "artists" event carries the full list for that section; "done" ends the stream.
+    """
+    query = q.strip().lower()
+    
+    # The session is released before the response streams, so query it up front
+    local = {
+        "albums": await search_local_albums(db, query),
+        "tracks": await search_local_tracks(db, query),
+        "artists": await search_local_artists(db, query)
+    }
+    
+    # Same caps as the combined search
+    sections = {
+        "albums": (merge_album_results, _ALBUM_LIST_ADAPTER, 20),
+        "tracks": (merge_track_results, _TRACK_LIST_ADAPTER, 20),
+        "artists": (merge_artist_results, _ARTIST_LIST_ADAPTER, 10)
+    }
     
-    # Search Qobuz API for remote results (with caching)
-    remote_albums = []
-    remote_tracks = []
-    remote_artists = []
+    def section_event(category: str, remote: list) -> str:
+        merge, adapter, cap = sections[category]
+        # Cached remote results are plain dicts - validate so everything serializes alike
+        items = adapter.validate_python(merge(local[category], remote, cap=cap))
+        return f"event: {category}\ndata: {adapter.dump_json(items).decode()}\n\n"
     
-    if include_remote:
-        cache_key = f"search_qobuz:{query}"
-        cached_results = await cache_get(cache_key)
+    async def events():
+        for category in local:
+            yield section_event(category, [])
         
+        count_search(query)
+        cached_results = await cache_get(f"search_qobuz:{query}")
         if cached_results:
-            remote_albums = cached_results.get("albums", [])
-            remote_tracks = cached_results.get("tracks", [])
-            remote_artists = cached_results.get("artists", [])
+            for category in local:
+                yield section_event(category, cached_results.get(category, []))
         else:
             qobuz_service = await QobuzService.create()
-            remote_results = await qobuz_service.search(query)
-            remote_albums = remote_results.get("albums", [])
-            remote_tracks = remote_results.get("tracks", [])
-            remote_artists = remote_results.get("artists", [])
-            # Cache the Qobuz results
-            await cache_set(cache_key, remote_results, SEARCH_CACHE_TTL)
-    
-    # Merge results, prioritizing local (downloaded) content
-    all_albums = merge_album_results(local_albums, remote_albums)
-    all_tracks = merge_track_results(local_tracks, remote_tracks)
-    all_artists = merge_artist_results(local_artists, remote_artists)
+            remote_results = {}
+            async for category, items in qobuz_service.search_stream(query):
+                remote_results[category] = items
+                yield section_event(category, items)
+            await cache_set(f"search_qobuz:{query}", remote_results, SEARCH_CACHE_TTL)
+        
+        yield "event: done\ndata: {}\n\n"
     
-    return SearchResult(
-        query=q,
-        albums=all_albums[:20],
-        tracks=all_tracks[:20],
-        artists=all_artists[:10]
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
+async def warm_search_cache():
+    """
+    Background loop that refreshes cached Qobuz results for the most popular
+    queries shortly before they expire, so repeat searches stay on the cache path.
+    """
+    while True:
+        await asyncio.sleep(SEARCH_WARM_INTERVAL)
+        try:
+            queries = await cache_top_members(SEARCH_FREQ_KEY, SEARCH_WARM_TOP_N)
+            for query in queries:
+                ttl = await cache_ttl(f"search_qobuz:{query}")
+                # Only refresh entries about to expire: -2 is missing (not searched
+                # recently, or evicted), -1 has no expiry (not ours to refresh)
+                if not 0 < ttl <= SEARCH_WARM_INTERVAL * 2:
+                    continue
+                await fetch_remote_results(query, refresh=True)
+        except Exception as e:
+            logger.error("Search cache warm error: %s", e)
+
+
 @router.get("/albums", response_model=List[AlbumResponse])
 async def search_albums(
     q: str = Query(..., min_length=1),
@@ -84,7 +247,8 @@ async def search_albums(
     qobuz_service = await QobuzService.create()
     remote_results = await qobuz_service.search_albums(query, limit=limit)
     
-    return merge_album_results(local_albums, remote_results)[:limit]
+    merged = merge_album_results(local_albums, remote_results, cap=limit)
+    return Response(content=_ALBUM_LIST_ADAPTER.dump_json(merged), media_type="application/json")
 
 
 @router.get("/tracks", response_model=List[TrackResponse])
@@ -104,7 +268,8 @@ async def search_tracks(
     qobuz_service = await QobuzService.create()
     remote_results = await qobuz_service.search_tracks(query, limit=limit)
     
-    return merge_track_results(local_tracks, remote_results)[:limit]
+    merged = merge_track_results(local_tracks, remote_results, cap=limit)
+    return Response(content=_TRACK_LIST_ADAPTER.dump_json(merged), media_type="application/json")
 
 
 @router.get("/artists", response_model=List[ArtistResponse])
@@ -124,18 +289,22 @@ async def search_artists(
     qobuz_service = await QobuzService.create()
     remote_results = await qobuz_service.search_artists(query, limit=limit)
     
-    return merge_artist_results(local_artists, remote_results)[:limit]
+    merged = merge_artist_results(local_artists, remote_results, cap=limit)
+    return Response(content=_ARTIST_LIST_ADAPTER.dump_json(merged), media_type="application/json")
 
 
 async def search_local_albums(db: AsyncSession, query: str, limit: int = 20) -> List[AlbumResponse]:
     """Search local albums database"""
+    pattern = f"%{query}%"
+    # Many-to-one JOIN (no duplicate rows) instead of a correlated EXISTS on the artist
     result = await db.execute(
         select(Album)
-        .options(selectinload(Album.artist))
+        .join(Artist, Album.artist_id == Artist.id)
+        .options(contains_eager(Album.artist))
         .where(
             or_(
-                Album.title.ilike(f"%{query}%"),
-                Album.artist.has(Artist.name.ilike(f"%{query}%"))
+                Album.title.ilike(pattern),
+                Artist.name.ilike(pattern)
             )
         )
         .limit(limit)
@@ -151,7 +320,8 @@ async def search_local_albums(db: AsyncSession, query: str, limit: int = 20) ->
         elif album.cover_art_url:
             cover_url = album.cover_art_url
         
-        responses.append(AlbumResponse(
+        # Trusted DB data - skip field validation
+        responses.append(AlbumResponse.model_construct(
             id=album.id,
             title=album.title,
             artist_name=album.artist.name,
@@ -162,7 +332,9 @@ async def search_local_albums(db: AsyncSession, query: str, limit: int = 20) ->
             release_date=album.release_date,
             genre=album.genre,
             total_tracks=album.total_tracks,
-            is_downloaded=album.is_downloaded
+            is_downloaded=album.is_downloaded,
+            title_normalized=album.title_normalized,
+            artist_name_normalized=album.artist.name_normalized
         ))
     
     return responses
@@ -170,13 +342,17 @@ async def search_local_albums(db: AsyncSession, query: str, limit: int = 20) ->
 
 async def search_local_tracks(db: AsyncSession, query: str, limit: int = 20) -> List[TrackResponse]:
     """Search local tracks database"""
+    pattern = f"%{query}%"
+    # Many-to-one JOINs (no duplicate rows) instead of a correlated EXISTS on the artist
     result = await db.execute(
         select(Track)
-        .options(selectinload(Track.artist), selectinload(Track.album))
+        .join(Artist, Track.artist_id == Artist.id)
+        .outerjoin(Album, Track.album_id == Album.id)
+        .options(contains_eager(Track.artist), contains_eager(Track.album))
         .where(
             or_(
-                Track.title.ilike(f"%{query}%"),
-                Track.artist.has(Artist.name.ilike(f"%{query}%"))
+                Track.title.ilike(pattern),
+                Artist.name.ilike(pattern)
             )
         )
         .limit(limit)
@@ -192,7 +368,8 @@ async def search_local_tracks(db: AsyncSession, query: str, limit: int = 20) ->
         elif track.album and track.album.cover_art_url:
             cover_url = track.album.cover_art_url
         
-        responses.append(TrackResponse(
+        # Trusted DB data - skip field validation
+        responses.append(TrackResponse.model_construct(
             id=track.id,
             title=track.title,
             artist_name=track.artist.name,
@@ -202,7 +379,10 @@ async def search_local_tracks(db: AsyncSession, query: str, limit: int = 20) ->
             track_number=track.track_number,
             duration=track.duration,
             is_downloaded=track.is_downloaded,
-            cover_art_url=cover_url
+            cover_art_url=cover_url,
+            title_normalized=track.title_normalized,
+            artist_name_normalized=track.artist.name_normalized,
+            album_title_normalized=track.album.title_normalized if track.album else None
         ))
     
     return responses
@@ -217,17 +397,16 @@ async def search_local_artists(db: AsyncSession, query: str, limit: int = 20) ->
     )
     artists = result.scalars().all()
     
-    return [ArtistResponse.model_validate(artist) for artist in artists]
-
-
-def normalize_title(title: str) -> str:
-    """Normalize title for comparison - lowercase, remove special chars"""
-    import re
-    if not title:
-        return ""
-    # Lowercase and remove special characters, extra spaces
-    normalized = re.sub(r'[^\w\s]', '', title.lower())
-    return ' '.join(normalized.split())
+    return [
+        ArtistResponse.model_construct(
+            id=artist.id,
+            name=artist.name,
+            qobuz_id=artist.qobuz_id,
+            image_url=artist.image_url,
+            bio=artist.bio
+        )
+        for artist in artists
+    ]
 
 
 def get_attr(obj, key, default=None):
@@ -237,34 +416,113 @@ def get_attr(obj, key, default=None):
     return getattr(obj, key, default)
 
 
-def merge_album_results(local: List[AlbumResponse], remote) -> List[AlbumResponse]:
-    """Merge local and remote album results, prioritizing local"""
+def get_normalized(obj, key: str) -> str:
+    """Get the precomputed normalized value for key, normalizing at runtime if absent"""
+    normalized = get_attr(obj, f'{key}_normalized')
+    if normalized is not None:
+        return normalized
+    return normalize_title(get_attr(obj, key, ''))
+
+
+def album_key(album) -> tuple:
+    """Dedup key for an album: normalized title+artist"""
+    return (get_normalized(album, 'title'), get_normalized(album, 'artist_name'))
+
+
+def track_key(track) -> tuple:
+    """Dedup key for a track: normalized title+artist+album"""
+    return (
+        get_normalized(track, 'title'),
+        get_normalized(track, 'artist_name'),
+        get_normalized(track, 'album_title')
+    )
+
+
+def edition_core(title: str) -> str:
+    """Normalized title without edition markers, e.g. "abbey road 2019 remaster" -> abbey road"""
+    tokens = title.split()
+    if not any(token in EDITION_WORDS for token in tokens):
+        return title
+    core = [token for token in tokens if token not in EDITION_WORDS]
+    without_numbers = [token for token in core if not _EDITION_NUMBER_RE.match(token)]
+    # Don't strip a title down to nothing ("1989 deluxe", "deluxe")
+    return ' '.join(without_numbers or core) or title
+
+
+def sequel_tokens(title: str) -> set:
+    """Numbers and roman numerals in a title, which set sequels apart"""
+    return {token for token in title.split() if _SEQUEL_TOKEN_RE.match(token)}
+
+
+def is_fuzzy_duplicate(key: tuple, local_cores: List[str], local_artists: List[str]) -> bool:
+    """
+    Check whether a normalized (title, artist) key fuzzily matches a local album.
+    Titles are compared with edition markers removed, so "abbey road" and
+    "abbey road remastered" match, but "led zeppelin" and "led zeppelin ii" don't.
+    The artist must also match closely so unrelated albums with generic titles survive.
+    """
+    title, artist = key
+    if not title or not local_cores:
+        return False
+    
+    core = edition_core(title)
+    sequel = sequel_tokens(core)
+    matches = process.extract(
+        core,
+        local_cores,
+        scorer=fuzz.ratio,
+        score_cutoff=FUZZY_TITLE_CUTOFF,
+        limit=None
+    )
+    for local_core, _, index in matches:
+        if (
+            sequel_tokens(local_core) == sequel
+            and fuzz.ratio(artist, local_artists[index]) >= FUZZY_ARTIST_CUTOFF
+        ):
+            return True
+    return False
+
+
+def merge_album_results(local: List[AlbumResponse], remote, cap: int = None) -> List[AlbumResponse]:
+    """Merge local and remote album results, prioritizing local, stopping at cap results"""
     seen_qobuz_ids = set()
     seen_title_artist = set()  # For matching by title+artist when no qobuz_id
+    local_cores = []  # For fuzzy matching remote editions against local albums
+    local_artists = []
     merged = []
     
     # Add local results first (they're downloaded)
     for album in local:
+        if cap is not None and len(merged) >= cap:
+            break
         merged.append(album)
         qobuz_id = get_attr(album, 'qobuz_id')
         if qobuz_id:
             seen_qobuz_ids.add(qobuz_id)
         # Also track by normalized title+artist for matching
-        key = (normalize_title(get_attr(album, 'title', '')), normalize_title(get_attr(album, 'artist_name', '')))
+        key = album_key(album)
         seen_title_artist.add(key)
+        local_cores.append(edition_core(key[0]))
+        local_artists.append(key[1])
     
     # Add remote results that aren't already local
     for album in remote:
+        if cap is not None and len(merged) >= cap:
+            break
         qobuz_id = get_attr(album, 'qobuz_id')
         # Skip if we have this qobuz_id locally
         if qobuz_id and qobuz_id in seen_qobuz_ids:
             continue
         
         # Skip if we have an album with same title+artist locally
-        key = (normalize_title(get_attr(album, 'title', '')), normalize_title(get_attr(album, 'artist_name', '')))
+        key = album_key(album)
         if key in seen_title_artist:
             continue
         
+        # Skip other editions of a local album (e.g. "Abbey Road (Remastered)")
+        if is_fuzzy_duplicate(key, local_cores, local_artists):
+            continue
+        
         merged.append(album)
         if qobuz_id:
             seen_qobuz_ids.add(qobuz_id)
@@ -273,37 +531,32 @@ def merge_album_results(local: List[AlbumResponse], remote) -> List[AlbumRespons
     return merged
 
 
-def merge_track_results(local: List[TrackResponse], remote) -> List[TrackResponse]:
-    """Merge local and remote track results, prioritizing local"""
+def merge_track_results(local: List[TrackResponse], remote, cap: int = None) -> List[TrackResponse]:
+    """Merge local and remote track results, prioritizing local, stopping at cap results"""
     seen_qobuz_ids = set()
     seen_title_artist = set()  # For matching by title+artist when no qobuz_id
     merged = []
     
     for track in local:
+        if cap is not None and len(merged) >= cap:
+            break
         merged.append(track)
         qobuz_id = get_attr(track, 'qobuz_id')
         if qobuz_id:
             seen_qobuz_ids.add(qobuz_id)
         # Also track by normalized title+artist for matching
-        key = (
-            normalize_title(get_attr(track, 'title', '')),
-            normalize_title(get_attr(track, 'artist_name', '')),
-            normalize_title(get_attr(track, 'album_title', ''))
-        )
-        seen_title_artist.add(key)
+        seen_title_artist.add(track_key(track))
     
     for track in remote:
+        if cap is not None and len(merged) >= cap:
+            break
         qobuz_id = get_attr(track, 'qobuz_id')
         # Skip if we have this qobuz_id locally
         if qobuz_id and qobuz_id in seen_qobuz_ids:
             continue
         
         # Skip if we have a track with same title+artist+album locally
-        key = (
-            normalize_title(get_attr(track, 'title', '')),
-            normalize_title(get_attr(track, 'artist_name', '')),
-            normalize_title(get_attr(track, 'album_title', ''))
-        )
+        key = track_key(track)
         if key in seen_title_artist:
             continue
         
@@ -315,8 +568,8 @@ def merge_track_results(local: List[TrackResponse], remote) -> List[TrackRespons
     return merged
 
 
-def merge_artist_results(local: List[ArtistResponse], remote) -> List[ArtistResponse]:
-    """Merge local and remote artist results, prioritizing local but using remote images"""
+def merge_artist_results(local: List[ArtistResponse], remote, cap: int = None) -> List[ArtistResponse]:
+    """Merge local and remote artist results, prioritizing local but using remote images, stopping at cap results"""
     seen_qobuz_ids = set()
     seen_names = set()
     merged = []
@@ -334,6 +587,8 @@ def merge_artist_results(local: List[ArtistResponse], remote) -> List[ArtistResp
             remote_by_name[name.lower()] = artist
     
     for artist in local:
+        if cap is not None and len(merged) >= cap:
+            break
         qobuz_id = get_attr(artist, 'qobuz_id')
         name = get_attr(artist, 'name')
         image_url = get_attr(artist, 'image_url')
@@ -363,6 +618,8 @@ def merge_artist_results(local: List[ArtistResponse], remote) -> List[ArtistResp
             seen_names.add(name.lower())
     
     for artist in remote:
+        if cap is not None and len(merged) >= cap:
+            break
         qobuz_id = get_attr(artist, 'qobuz_id')
         name = get_attr(artist, 'name')
         # Skip if we already have this artist by qobuz_id or name
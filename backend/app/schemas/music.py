@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -31,6 +31,10 @@ class TrackResponse(BaseModel):
     is_downloaded: bool = False
     play_count: int = 0
     cover_art_url: Optional[str] = None
+    # Precomputed dedup keys for local results; never serialized
+    title_normalized: Optional[str] = Field(default=None, exclude=True)
+    artist_name_normalized: Optional[str] = Field(default=None, exclude=True)
+    album_title_normalized: Optional[str] = Field(default=None, exclude=True)
 
     class Config:
         from_attributes = True
@@ -52,6 +56,9 @@ class AlbumResponse(BaseModel):
     duration_formatted: Optional[str] = None
     is_downloaded: bool = False
     tracks: List[TrackResponse] = []
+    # Precomputed dedup keys for local results; never serialized
+    title_normalized: Optional[str] = Field(default=None, exclude=True)
+    artist_name_normalized: Optional[str] = Field(default=None, exclude=True)
 
     class Config:
         from_attributes = True
@@ -1,11 +1,30 @@
 import json
+import fnmatch
+import socket
 import redis.asyncio as redis
+from cachetools import TTLCache
 from typing import Optional, Any
 from pydantic import BaseModel
 from app.config import settings
 
 _redis_client: Optional[redis.Redis] = None
 
+# Redis connection pool tuning
+REDIS_MAX_CONNECTIONS = 50
+REDIS_SOCKET_TIMEOUT = 2.0  # seconds
+REDIS_HEALTH_CHECK_INTERVAL = 30  # seconds - ping idle connections before reuse
+REDIS_KEEPALIVE_OPTIONS = (
+    {socket.TCP_KEEPIDLE: 60} if hasattr(socket, "TCP_KEEPIDLE") else {}
+)
+
+# In-process first-level cache in front of Redis. Hot keys (e.g. search_qobuz:{q}
+# while the user is typing) are served from memory without a Redis round trip.
+# TTLCache expires on time.monotonic() and evicts least recently used entries.
+# All access happens on the event loop with no awaits in between, so no lock is needed.
+L1_CACHE_MAXSIZE = 512
+L1_CACHE_TTL = 60  # 1 minute
+_l1_cache: TTLCache = TTLCache(maxsize=L1_CACHE_MAXSIZE, ttl=L1_CACHE_TTL)
+
 
 def serialize_for_cache(obj: Any) -> Any:
     """Convert Pydantic models and other objects to JSON-serializable format"""
@@ -22,28 +41,76 @@ async def get_redis() -> redis.Redis:
     """Get or create Redis client"""
     global _redis_client
     if _redis_client is None:
-        _redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+        _redis_client = redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_keepalive=True,
+            socket_keepalive_options=REDIS_KEEPALIVE_OPTIONS,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+            retry_on_timeout=True
+        )
     return _redis_client
 
 
+async def init_redis() -> None:
+    """Create the Redis client and open a first pooled connection"""
+    try:
+        client = await get_redis()
+        await client.ping()
+    except Exception as e:
+        print(f"Redis init error: {e}")
+
+
+async def close_redis() -> None:
+    """Close the Redis client and release pooled connections"""
+    global _redis_client
+    if _redis_client is not None:
+        try:
+            await _redis_client.aclose()
+        except Exception as e:
+            print(f"Redis close error: {e}")
+        _redis_client = None
+
+
 async def cache_get(key: str) -> Optional[Any]:
-    """Get value from cache"""
+    """Get value from cache (in-process L1 first, then Redis)"""
+    value = _l1_cache.get(key)
+    if value is not None:
+        return value
+    
     try:
         client = await get_redis()
-        value = await client.get(key)
+        # TTL in the same round trip, so L1 never outlives the Redis entry
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.ttl(key)
+            value, ttl = await pipe.execute()
         if value:
-            return json.loads(value)
+            value = json.loads(value)
+            # Same rule as cache_set: only keep entries that outlast the L1 TTL
+            if ttl >= L1_CACHE_TTL:
+                _l1_cache[key] = value
+            return value
         return None
     except Exception as e:
         print(f"Cache get error: {e}")
         return None
 
 
-async def cache_set(key: str, value: Any, ttl: int = 300) -> bool:
-    """Set value in cache with TTL (default 5 minutes)"""
+async def cache_set(key: str, value: Any, ttl: int = 300, l1: bool = True) -> bool:
+    """
+    Set value in cache with TTL (default 5 minutes).
+    l1=False writes Redis only, for rarely read entries that shouldn't evict hot keys.
+    """
+    serializable = serialize_for_cache(value)
+    # Write-through to L1, unless the entry is meant to expire sooner than L1 would drop it
+    if l1 and ttl >= L1_CACHE_TTL:
+        _l1_cache[key] = serializable
     try:
         client = await get_redis()
-        serializable = serialize_for_cache(value)
         await client.setex(key, ttl, json.dumps(serializable))
         return True
     except Exception as e:
@@ -53,6 +120,7 @@ async def cache_set(key: str, value: Any, ttl: int = 300) -> bool:
 
 async def cache_delete(key: str) -> bool:
     """Delete value from cache"""
+    _l1_cache.pop(key, None)
     try:
         client = await get_redis()
         await client.delete(key)
@@ -64,6 +132,8 @@ async def cache_delete(key: str) -> bool:
 
 async def cache_clear_pattern(pattern: str) -> int:
     """Delete all keys matching pattern"""
+    for key in [k for k in list(_l1_cache.keys()) if fnmatch.fnmatchcase(k, pattern)]:
+        _l1_cache.pop(key, None)
     try:
         client = await get_redis()
         keys = []
@@ -75,3 +145,40 @@ async def cache_clear_pattern(pattern: str) -> int:
     except Exception as e:
         print(f"Cache clear error: {e}")
         return 0
+
+
+async def cache_ttl(key: str) -> int:
+    """Get remaining TTL of a Redis key in seconds (-2 if missing, -1 if no expiry)"""
+    try:
+        client = await get_redis()
+        return await client.ttl(key)
+    except Exception as e:
+        print(f"Cache ttl error: {e}")
+        return -2
+
+
+async def cache_incr_score(key: str, member: str, expire: int = None) -> bool:
+    """Increment a member's score in a sorted set, optionally setting an expiry on first write"""
+    try:
+        client = await get_redis()
+        # One round trip for both commands
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zincrby(key, 1, member)
+            if expire:
+                # NX: only set when the key has no expiry yet, so the window is not extended
+                pipe.expire(key, expire, nx=True)
+            await pipe.execute()
+        return True
+    except Exception as e:
+        print(f"Cache incr error: {e}")
+        return False
+
+
+async def cache_top_members(key: str, count: int) -> list:
+    """Get the highest scoring members of a sorted set"""
+    try:
+        client = await get_redis()
+        return await client.zrevrange(key, 0, count - 1)
+    except Exception as e:
+        print(f"Cache top members error: {e}")
+        return []
@@ -1,23 +1,105 @@
 import asyncio
+import logging
 import os
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, insert, update, true, or_, and_, case, literal, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 
-from app.models.music import DownloadTask, Album, Track, Artist, QueueItem
+from app.models.music import DownloadTask, Album, Track, Artist, QueueItem, ACTIVE_DOWNLOAD_STATUSES, ACTIVE_DOWNLOAD_PREDICATE, normalize_title
 from app.models.settings import StorageLocation, QobuzConfig
 from app.services.streamrip import StreamripService
 from app.services.music import MusicService
+from app.schemas.music import DownloadTaskResponse
+
+logger = logging.getLogger("auvia.download")
+
+# Number of downloads processed concurrently per process; further requests stay pending
+DOWNLOAD_WORKERS = 2
+
+# Downloads requested within DOWNLOAD_BATCH_WINDOW seconds of each other share
+# one streamrip process (and Qobuz login), up to DOWNLOAD_BATCH_SIZE albums
+DOWNLOAD_BATCH_SIZE = 4
+DOWNLOAD_BATCH_WINDOW = 0.5
+
+# Pending tasks live in the download_tasks table. Idle workers are woken when this
+# process queues a download, and otherwise poll for tasks queued by other replicas.
+DOWNLOAD_POLL_INTERVAL = 5  # seconds
+
+# Tasks left "downloading" longer than this belong to a worker that was stopped or
+# crashed mid-download (e.g. a restart), and are claimed again
+DOWNLOAD_CLAIM_TIMEOUT = timedelta(hours=2)
+
+# Library scans allowed at once when several downloads finish together, so their
+# tag reading and insert bursts don't all hit the disk and database concurrently
+SCAN_CONCURRENCY = 2
+_scan_semaphore = asyncio.Semaphore(SCAN_CONCURRENCY)
+_download_wakeup = asyncio.Event()
+_download_workers: list = []
+
+# Download status subscribers (one queue per connected WebSocket client)
+STATUS_SUBSCRIBER_QUEUE_SIZE = 100
+_status_subscribers: set = set()
+
+
+def subscribe_download_status() -> asyncio.Queue:
+    """
+    Register a listener for download status changes. A None update means the
+    listener fell behind and was unsubscribed.
+    """
+    queue = asyncio.Queue(maxsize=STATUS_SUBSCRIBER_QUEUE_SIZE)
+    _status_subscribers.add(queue)
+    return queue
+
+
+def unsubscribe_download_status(queue: asyncio.Queue):
+    """Remove a download status listener"""
+    _status_subscribers.discard(queue)
+
+
+def publish_download_status(task: DownloadTask):
+    """Push a task's current state to all status listeners"""
+    if not _status_subscribers:
+        return
+    
+    event = DownloadTaskResponse.model_validate(task).model_dump(mode="json")
+    for queue in list(_status_subscribers):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client - rather than block the download or silently lose an update
+            # (maybe the final one), replace its backlog with None, which tells the
+            # listener to drop the client so it resyncs
+            _status_subscribers.discard(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
 
 
 class DownloadService:
     """Service for managing music downloads via streamrip"""
     
+    # Resolved download settings shared across downloads. Admin changes bump
+    # _settings_version via invalidate_settings_cache(); stale entries are refetched lazily.
+    _settings_version = 0
+    _cached_version = -1
+    _storage_path_cache: Optional[str] = None
+    _qobuz_config_cache: Optional[SimpleNamespace] = None
+    _streamrip_configured_version = -1
+    
     def __init__(self, db: AsyncSession):
         self.db = db
         self.streamrip = StreamripService()
     
+    @classmethod
+    def invalidate_settings_cache(cls):
+        """Drop cached storage location / Qobuz config after they were changed"""
+        cls._settings_version += 1
+    
     async def start_download(
         self,
         qobuz_url: str,
@@ -30,165 +112,315 @@ class DownloadService:
         play_next: bool = False
     ) -> DownloadTask:
         """Start a new download task"""
-        # Check if already downloading this URL
+        # Create download task, unless this URL is already being downloaded
+        # (enforced atomically by the partial unique index on active URLs)
         result = await self.db.execute(
-            select(DownloadTask).where(
-                DownloadTask.qobuz_url == qobuz_url,
-                DownloadTask.status.in_(["pending", "downloading"])
+            pg_insert(DownloadTask)
+            .values(
+                qobuz_url=qobuz_url,
+                album_title=album_title,
+                artist_name=artist_name,
+                status="pending",
+                play_track_id=track_id,
+                play_track_title=track_title,
+                play_track_number=track_number,
+                play_now=play_now,
+                play_next=play_next
+            )
+            .on_conflict_do_nothing(
+                index_elements=[DownloadTask.qobuz_url],
+                index_where=ACTIVE_DOWNLOAD_PREDICATE
             )
+            .returning(DownloadTask)
         )
-        existing = result.scalar_one_or_none()
+        task = result.scalar_one_or_none()
+        await self.db.commit()
         
-        if existing:
-            return existing
+        if task is None:
+            # Already downloading this URL
+            result = await self.db.execute(
+                select(DownloadTask).where(
+                    DownloadTask.qobuz_url == qobuz_url,
+                    DownloadTask.status.in_(ACTIVE_DOWNLOAD_STATUSES)
+                )
+            )
+            return result.scalar_one()
         
-        # Create download task
-        task = DownloadTask(
-            qobuz_url=qobuz_url,
-            album_title=album_title,
-            artist_name=artist_name,
-            status="pending"
-        )
-        self.db.add(task)
-        await self.db.commit()
-        await self.db.refresh(task)
+        publish_download_status(task)
         
-        # Start download in background
-        asyncio.create_task(self._execute_download(task.id, track_id, track_title, track_number, play_now, play_next))
+        # Hand off to the download workers
+        _download_wakeup.set()
         
         return task
     
-    async def _execute_download(self, task_id: int, play_track_id: str = None, play_track_title: str = None, play_track_number: int = None, play_now: bool = False, play_next: bool = False):
-        """Execute the download in background"""
+    async def _execute_downloads(self) -> bool:
+        """
+        Claim pending downloads and execute them with a single streamrip run.
+        Returns False if there was nothing to claim.
+        """
         from app.database import async_session_maker
-        from sqlalchemy.orm import selectinload
         
         async with async_session_maker() as db:
-            # Get task
+            # Claim the oldest pending tasks, plus any whose worker went away
+            # mid-download. SKIP LOCKED lets other workers (and other backend
+            # replicas) claim different rows at the same time.
+            stale_before = datetime.now(timezone.utc) - DOWNLOAD_CLAIM_TIMEOUT
             result = await db.execute(
-                select(DownloadTask).where(DownloadTask.id == task_id)
+                select(DownloadTask)
+                .where(or_(
+                    DownloadTask.status == "pending",
+                    and_(
+                        DownloadTask.status == "downloading",
+                        or_(DownloadTask.claimed_at.is_(None), DownloadTask.claimed_at < stale_before)
+                    )
+                ))
+                .order_by(DownloadTask.created_at, DownloadTask.id)
+                .limit(DOWNLOAD_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
             )
-            task = result.scalar_one_or_none()
+            claimed = result.scalars().all()
             
-            if not task:
-                return
+            if not claimed:
+                return False
             
-            try:
-                # Update status
+            for task in claimed:
                 task.status = "downloading"
-                await db.commit()
-                
-                # Get download path
-                storage_result = await db.execute(
-                    select(StorageLocation).where(
-                        StorageLocation.is_primary == True,
-                        StorageLocation.is_active == True
-                    )
-                )
-                storage = storage_result.scalar_one_or_none()
-                
-                if not storage:
-                    # Fall back to first active storage
-                    storage_result = await db.execute(
-                        select(StorageLocation).where(StorageLocation.is_active == True)
-                    )
-                    storage = storage_result.scalar_one_or_none()
-                
-                download_path = storage.path if storage else "/music"
-                
-                # Initialize streamrip config with Qobuz credentials
-                qobuz_result = await db.execute(select(QobuzConfig).limit(1))
-                qobuz_config = qobuz_result.scalar_one_or_none()
+                task.claimed_at = datetime.now(timezone.utc)
+            await db.commit()
+            for task in claimed:
+                publish_download_status(task)
+            
+            download_path = "/music"
+            error_message = "Download failed"
+            album_dirs = {}
+            
+            try:
+                storage_path, qobuz_config, settings_version = await self._load_download_settings(db)
+                download_path = storage_path or download_path
                 
+                # Initialize streamrip config with Qobuz credentials (once per settings change)
                 if qobuz_config:
-                    await self.streamrip.update_config(qobuz_config)
+                    if DownloadService._streamrip_configured_version != settings_version:
+                        if await self.streamrip.update_config(qobuz_config):
+                            DownloadService._streamrip_configured_version = settings_version
                 else:
-                    print("Warning: No Qobuz config found")
+                    logger.warning("No Qobuz config found")
                 
                 # Execute streamrip download
-                success, output_path = await self.streamrip.download(
-                    task.qobuz_url,
-                    download_path
-                )
-                
-                if success:
-                    # Extract qobuz_id from URL for linking
-                    qobuz_album_id = task.qobuz_url.rstrip('/').split('/')[-1]
-                    scan_path = output_path or download_path
-                    
-                    # Wait briefly to ensure files are fully written to disk
-                    await asyncio.sleep(1)
+                if len(claimed) == 1:
+                    task = claimed[0]
+                    success, output_path = await self.streamrip.download(task.qobuz_url, download_path)
+                    if success:
+                        album_dirs[task.id] = output_path or download_path
+                else:
+                    success, new_dirs = await self.streamrip.download_batch(
+                        [task.qobuz_url for task in claimed],
+                        download_path
+                    )
+                    if success:
+                        album_dirs = await self._match_album_dirs(claimed, new_dirs)
+                        unmatched = [task for task in claimed if task.id not in album_dirs]
+                        if unmatched:
+                            # Re-downloads land in folders that already existed - look among all of them
+                            existing_dirs = await asyncio.to_thread(self.streamrip.album_dirs, download_path)
+                            taken = set(album_dirs.values())
+                            album_dirs.update(await self._match_album_dirs(
+                                unmatched,
+                                [album_dir for album_dir in existing_dirs if album_dir not in taken]
+                            ))
+            except Exception as e:
+                success = False
+                error_message = str(e)
+                logger.error("Download error: %s", e)
+                await self._rollback(db, claimed)
+            
+            for task in claimed:
+                try:
+                    scan_path = album_dirs.get(task.id)
+                    if scan_path:
+                        await self._finish_download(db, task, scan_path)
+                    else:
+                        task.status = "failed"
+                        # Never guess a batch album's folder - scanning the wrong one mislinks tracks
+                        task.error_message = "Could not find the downloaded album folder" if success else error_message
                     
-                    # Scan downloaded files and add to database with qobuz_id
-                    music_service = MusicService(db)
-                    scan_stats = await music_service.scan_directory(
+                    # One commit for the final status, completion time and any queued tracks
+                    await db.commit()
+                except Exception as e:
+                    logger.error("Download error: %s", e)
+                    try:
+                        # Drop the partial scan and record the failure on its own
+                        await self._rollback(db, claimed)
+                        task.status = "failed"
+                        task.error_message = str(e)
+                        await db.commit()
+                    except Exception as e:
+                        # Left "downloading" - claimed again after DOWNLOAD_CLAIM_TIMEOUT
+                        logger.error("Could not mark download failed: %s", e)
+                        continue
+                
+                publish_download_status(task)
+        
+        return True
+    
+    async def _rollback(self, db: AsyncSession, tasks: list):
+        """Roll back a failed transaction, reloading the tasks the rollback expired"""
+        await db.rollback()
+        task_ids = [inspect(task).identity[0] for task in tasks]
+        result = await db.execute(select(DownloadTask).where(DownloadTask.id.in_(task_ids)))
+        result.scalars().all()
+    
+    async def _load_download_settings(self, db: AsyncSession) -> tuple:
+        """Get the download path and Qobuz config to use, from cache when unchanged"""
+        settings_version = DownloadService._settings_version
+        if DownloadService._cached_version != settings_version:
+            # Get download path and Qobuz config in a single round trip
+            primary_path = (
+                select(StorageLocation.path)
+                .where(StorageLocation.is_primary == True, StorageLocation.is_active == True)
+                .limit(1)
+                .scalar_subquery()
+            )
+            # Fall back to first active storage
+            fallback_path = (
+                select(StorageLocation.path)
+                .where(StorageLocation.is_active == True)
+                .order_by(StorageLocation.id)
+                .limit(1)
+                .scalar_subquery()
+            )
+            qobuz_config_row = aliased(QobuzConfig, select(QobuzConfig).limit(1).subquery())
+            
+            result = await db.execute(
+                select(func.coalesce(primary_path, fallback_path), qobuz_config_row)
+                .select_from(select(literal(1)).subquery())
+                .outerjoin(qobuz_config_row, true())
+            )
+            storage_path, qobuz_config = result.one()
+            if qobuz_config is not None:
+                # Keep plain values - a mapped instance would be expired and detached
+                # by a rollback or close of this session, and break later downloads
+                qobuz_config = SimpleNamespace(**{
+                    column.key: getattr(qobuz_config, column.key)
+                    for column in inspect(QobuzConfig).column_attrs
+                })
+            
+            DownloadService._storage_path_cache = storage_path
+            DownloadService._qobuz_config_cache = qobuz_config
+            DownloadService._cached_version = settings_version
+        
+        return (
+            DownloadService._storage_path_cache,
+            DownloadService._qobuz_config_cache,
+            settings_version
+        )
+    
+    async def _match_album_dirs(self, tasks: list, album_dirs: list) -> dict:
+        """Work out which new folder of a batch download belongs to which task"""
+        from app.services.qobuz import QobuzService
+        
+        # streamrip names folders "{albumartist} - {title} ({year})"; compare without punctuation/spaces
+        def squash(text: str) -> str:
+            return normalize_title(text).replace(" ", "")
+        
+        qobuz = await QobuzService.create()
+        albums = await asyncio.gather(*(
+            qobuz.get_album(task.qobuz_url.rstrip('/').split('/')[-1]) for task in tasks
+        ))
+        
+        # Shortest names first, so an album matches its own folder before a longer edition's
+        remaining = {
+            album_dir: squash(os.path.basename(album_dir))
+            for album_dir in sorted(album_dirs, key=lambda album_dir: len(os.path.basename(album_dir)))
+        }
+        matched = {}
+        
+        # Longest titles first, so "Live" can't claim the folder of "Live at Wembley"
+        candidates = sorted(
+            ((task, album) for task, album in zip(tasks, albums) if album and album.title),
+            key=lambda pair: len(pair[1].title),
+            reverse=True
+        )
+        for task, album in candidates:
+            title = squash(album.title)
+            artist = squash(album.artist_name)
+            for album_dir, name in remaining.items():
+                if title in name and artist in name:
+                    matched[task.id] = album_dir
+                    del remaining[album_dir]
+                    break
+        
+        return matched
+    
+    async def _finish_download(self, db: AsyncSession, task: DownloadTask, scan_path: str):
+        """Scan a downloaded album into the library and queue it if requested"""
+        # Extract qobuz_id from URL for linking
+        # URL format: https://www.qobuz.com/us-en/album/album-slug/ALBUM_ID
+        qobuz_album_id = task.qobuz_url.rstrip('/').split('/')[-1]
+        
+        # Wait briefly to ensure files are fully written to disk
+        await asyncio.sleep(1)
+        
+        # Scan downloaded files and add to database with qobuz_id
+        music_service = MusicService(db)
+        async with _scan_semaphore:
+            await music_service.scan_directory(
+                scan_path,
+                qobuz_album_id=qobuz_album_id,
+                qobuz_url=task.qobuz_url
+            )
+        
+        # Verify tracks have proper metadata - retry scan if needed
+        album = await self._verify_album_tracks(db, qobuz_album_id, task.qobuz_url)
+        if album:
+            # Check if any tracks have 0 duration - indicates incomplete metadata
+            tracks_need_rescan = any(
+                t.duration is None or t.duration == 0 
+                for t in album.tracks if t.is_downloaded
+            )
+            if tracks_need_rescan:
+                logger.info("Some tracks have missing duration, waiting and re-scanning...")
+                await asyncio.sleep(2)  # Wait for filesystem to settle
+                async with _scan_semaphore:
+                    await music_service.scan_directory(
                         scan_path,
                         qobuz_album_id=qobuz_album_id,
                         qobuz_url=task.qobuz_url
                     )
-                    
-                    # Verify tracks have proper metadata - retry scan if needed
-                    album = await self._verify_album_tracks(db, qobuz_album_id, task.qobuz_url)
-                    if album:
-                        # Check if any tracks have 0 duration - indicates incomplete metadata
-                        tracks_need_rescan = any(
-                            t.duration is None or t.duration == 0 
-                            for t in album.tracks if t.is_downloaded
-                        )
-                        if tracks_need_rescan:
-                            print(f"Some tracks have missing duration, waiting and re-scanning...")
-                            await asyncio.sleep(2)  # Wait for filesystem to settle
-                            await music_service.scan_directory(
-                                scan_path,
-                                qobuz_album_id=qobuz_album_id,
-                                qobuz_url=task.qobuz_url
-                            )
-                    
-                    task.status = "completed"
-                    task.completed_at = datetime.utcnow()
-                    
-                    # Queue tracks if requested
-                    if play_now or play_next:
-                        await self._queue_downloaded_tracks(
-                            db, task.qobuz_url, play_track_id, play_track_title, play_track_number, play_now, play_next
-                        )
-                else:
-                    task.status = "failed"
-                    task.error_message = "Download failed"
-                
-            except Exception as e:
-                task.status = "failed"
-                task.error_message = str(e)
-                print(f"Download error: {e}")
-            
-            await db.commit()
+        
+        task.status = "completed"
+        task.completed_at = datetime.utcnow()
+        
+        # Queue tracks if requested
+        if task.play_now or task.play_next:
+            await self._queue_downloaded_tracks(
+                db, qobuz_album_id, task.qobuz_url,
+                task.play_track_id, task.play_track_title, task.play_track_number,
+                task.play_now, task.play_next
+            )
     
     async def _verify_album_tracks(self, db: AsyncSession, qobuz_album_id: str, qobuz_url: str) -> Optional[Album]:
         """Verify that album tracks were properly scanned with metadata"""
         from sqlalchemy.orm import selectinload
         
-        # Find the album by qobuz_id
         result = await db.execute(
             select(Album)
             .options(selectinload(Album.tracks))
-            .where(Album.qobuz_id == qobuz_album_id)
+            .where(self._album_match(qobuz_album_id, qobuz_url))
+            .order_by((Album.qobuz_id == qobuz_album_id).desc())
+            .limit(1)
         )
-        album = result.scalar_one_or_none()
-        
-        if not album:
-            # Try to find by qobuz_url
-            result = await db.execute(
-                select(Album)
-                .options(selectinload(Album.tracks))
-                .where(Album.qobuz_url == qobuz_url)
-            )
-            album = result.scalar_one_or_none()
-        
-        return album
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    def _album_match(qobuz_album_id: str, qobuz_url: str):
+        """Match an album by qobuz_id or, failing that, by qobuz_url"""
+        return or_(Album.qobuz_id == qobuz_album_id, Album.qobuz_url == qobuz_url)
     
     async def _queue_downloaded_tracks(
         self,
         db: AsyncSession,
+        qobuz_album_id: str,
         qobuz_url: str,
         play_track_id: str = None,
         play_track_title: str = None,
@@ -196,130 +428,130 @@ class DownloadService:
         play_now: bool = False,
         play_next: bool = False
     ):
-        """Queue downloaded tracks for playback"""
-        from sqlalchemy.orm import selectinload
-        
+        """Queue downloaded tracks for playback (committed by the caller with the task status)"""
+        # Savepoint, so a failure here doesn't take the completed download down with it
+        savepoint = await db.begin_nested()
         try:
-            # Extract qobuz album ID from URL
-            # URL format: https://www.qobuz.com/us-en/album/album-slug/ALBUM_ID
-            qobuz_album_id = qobuz_url.rstrip('/').split('/')[-1]
-            
-            # Find the album by qobuz_id
+            # Find the album by qobuz_id, falling back to qobuz_url, in one query
             result = await db.execute(
-                select(Album)
-                .options(selectinload(Album.tracks))
-                .where(Album.qobuz_id == qobuz_album_id)
+                select(Album.id)
+                .where(self._album_match(qobuz_album_id, qobuz_url))
+                .order_by((Album.qobuz_id == qobuz_album_id).desc())
+                .limit(1)
             )
-            album = result.scalar_one_or_none()
-            
-            if not album:
-                # Try to find by qobuz_url
-                result = await db.execute(
-                    select(Album)
-                    .options(selectinload(Album.tracks))
-                    .where(Album.qobuz_url == qobuz_url)
-                )
-                album = result.scalar_one_or_none()
+            album_id = result.scalar_one_or_none()
             
-            if not album or not album.tracks:
-                print(f"Could not find album or tracks for queueing: {qobuz_url}")
+            if not album_id:
+                logger.warning("Could not find album for queueing: %s", qobuz_url)
                 return
             
             # Sort tracks by disc and track number
-            tracks = sorted(album.tracks, key=lambda t: (t.disc_number or 1, t.track_number or 0))
+            track_order = (func.coalesce(Track.disc_number, 1), func.coalesce(Track.track_number, 0))
             
-            # If a specific track was requested, find it
+            # If a specific track was requested, let the database find it
             target_track = None
             if play_track_id or play_track_title or play_track_number:
-                print(f"Looking for specific track - qobuz_id: {play_track_id}, title: {play_track_title}, number: {play_track_number}")
+                logger.debug(
+                    "Looking for specific track - qobuz_id: %s, title: %s, number: %s",
+                    play_track_id, play_track_title, play_track_number
+                )
                 
-                # Try to match by qobuz_id first
+                # Match by qobuz_id first, then track number, then title (case-insensitive, partial match)
+                matches = []
                 if play_track_id:
-                    target_track = next((t for t in tracks if t.qobuz_id == play_track_id), None)
+                    matches.append(Track.qobuz_id == play_track_id)
+                if play_track_number:
+                    matches.append(Track.track_number == play_track_number)
+                if play_track_title:
+                    matches.append(
+                        func.lower(Track.title).contains(play_track_title.lower().strip(), autoescape=True)
+                    )
                 
-                # Try to match by track number
-                if not target_track and play_track_number:
-                    target_track = next((t for t in tracks if t.track_number == play_track_number), None)
-                    if target_track:
-                        print(f"Found track by track number {play_track_number}: {target_track.title}")
+                result = await db.execute(
+                    select(Track)
+                    .where(Track.album_id == album_id, or_(*matches))
+                    .order_by(case(*[(match, i) for i, match in enumerate(matches)]), *track_order)
+                    .limit(1)
+                )
+                target_track = result.scalar_one_or_none()
+            
+            if target_track:
+                logger.debug("Queueing only specific track: %s", target_track.title)
+                tracks = [target_track]  # Only queue the specific track
+            else:
+                result = await db.execute(
+                    select(Track)
+                    .where(Track.album_id == album_id)
+                    .order_by(*track_order)
+                )
+                tracks = result.scalars().all()
                 
-                # Try to match by title (case-insensitive, partial match)
-                if not target_track and play_track_title:
-                    normalized_title = play_track_title.lower().strip()
-                    for t in tracks:
-                        if t.title and normalized_title in t.title.lower():
-                            target_track = t
-                            print(f"Found track by title match: {target_track.title}")
-                            break
+                if not tracks:
+                    logger.warning("Could not find tracks for queueing: %s", qobuz_url)
+                    return
                 
-                if target_track:
-                    print(f"Queueing only specific track: {target_track.title}")
-                    tracks = [target_track]  # Only queue the specific track
-                else:
-                    print(f"Could not find specific track, queueing all {len(tracks)} tracks")
+                if play_track_id or play_track_title or play_track_number:
+                    logger.info("Could not find specific track, queueing all %d tracks", len(tracks))
             
             if play_now:
                 # Clear existing queue and add new tracks
                 await db.execute(delete(QueueItem))
                 
-                for i, track in enumerate(tracks):
-                    queue_item = QueueItem(
-                        track_id=track.id,
-                        position=i + 1,
-                        is_playing=(i == 0)  # First track starts playing
-                    )
-                    db.add(queue_item)
+                await db.execute(insert(QueueItem), [
+                    {
+                        "track_id": track.id,
+                        "position": i + 1,
+                        "is_playing": i == 0  # First track starts playing
+                    }
+                    for i, track in enumerate(tracks)
+                ])
                 
-                print(f"Queued {len(tracks)} tracks for immediate playback")
+                logger.info("Queued %d tracks (mode=play_now)", len(tracks))
                 
             elif play_next:
-                # Find current playing position and insert after
-                current_result = await db.execute(
-                    select(QueueItem).where(QueueItem.is_playing == True)
+                # Insert after the currently playing item (or at the start if nothing is playing),
+                # resolving its position inside each statement instead of a separate SELECT
+                insert_position = func.coalesce(
+                    select(QueueItem.position + 1)
+                    .where(QueueItem.is_playing == True)
+                    .limit(1)
+                    .scalar_subquery(),
+                    1
                 )
-                current = current_result.scalar_one_or_none()
                 
-                if current:
-                    insert_position = current.position + 1
-                    
-                    # Shift existing items to make room
-                    await db.execute(
-                        QueueItem.__table__.update()
-                        .where(QueueItem.position >= insert_position)
-                        .values(position=QueueItem.position + len(tracks))
-                    )
-                else:
-                    insert_position = 1
+                # Shift existing items to make room
+                await db.execute(
+                    QueueItem.__table__.update()
+                    .where(QueueItem.position >= insert_position)
+                    .values(position=QueueItem.position + len(tracks))
+                )
                 
-                for i, track in enumerate(tracks):
-                    queue_item = QueueItem(
-                        track_id=track.id,
-                        position=insert_position + i,
-                        is_playing=False
-                    )
-                    db.add(queue_item)
+                await db.execute(
+                    insert(QueueItem).values([
+                        {"track_id": track.id, "position": insert_position + i, "is_playing": False}
+                        for i, track in enumerate(tracks)
+                    ])
+                )
                 
-                print(f"Queued {len(tracks)} tracks to play next")
+                logger.info("Queued %d tracks (mode=play_next)", len(tracks))
             
             else:
                 # Add to end of queue
                 max_pos_result = await db.execute(select(func.max(QueueItem.position)))
                 max_pos = max_pos_result.scalar() or 0
                 
-                for i, track in enumerate(tracks):
-                    queue_item = QueueItem(
-                        track_id=track.id,
-                        position=max_pos + i + 1,
-                        is_playing=False
-                    )
-                    db.add(queue_item)
+                await db.execute(insert(QueueItem), [
+                    {"track_id": track.id, "position": max_pos + i + 1, "is_playing": False}
+                    for i, track in enumerate(tracks)
+                ])
                 
-                print(f"Added {len(tracks)} tracks to queue")
+                logger.info("Queued %d tracks (mode=append)", len(tracks))
             
-            await db.commit()
+            await savepoint.commit()
             
         except Exception as e:
-            print(f"Error queueing tracks: {e}")
+            logger.error("Error queueing tracks: %s", e)
+            await savepoint.rollback()
     
     async def get_task_status(self, task_id: int) -> Optional[DownloadTask]:
         """Get status of a download task"""
@@ -330,17 +562,22 @@ class DownloadService:
     
     async def cancel_download(self, task_id: int) -> bool:
         """Cancel a pending download"""
+        # Conditional UPDATE instead of SELECT-then-modify: one round trip, and a
+        # worker can't claim the task between the check and the write
         result = await self.db.execute(
-            select(DownloadTask).where(
+            update(DownloadTask)
+            .where(
                 DownloadTask.id == task_id,
                 DownloadTask.status == "pending"
             )
+            .values(status="cancelled")
+            .returning(DownloadTask)
         )
         task = result.scalar_one_or_none()
+        await self.db.commit()
         
         if task:
-            task.status = "cancelled"
-            await self.db.commit()
+            publish_download_status(task)
             return True
         
         return False
@@ -358,10 +595,20 @@ class DownloadService:
         if task:
             task.status = "pending"
             task.error_message = None
-            await self.db.commit()
+            # A retry only downloads again - don't take over playback later
+            task.play_now = False
+            task.play_next = False
+            try:
+                await self.db.commit()
+            except IntegrityError:
+                # The same URL is already pending/downloading in another task
+                await self.db.rollback()
+                return None
             
-            # Start download again
-            asyncio.create_task(self._execute_download(task.id))
+            publish_download_status(task)
+            
+            # Queue download again
+            _download_wakeup.set()
             return task
         
         return None
@@ -373,16 +620,47 @@ class DownloadService:
         cutoff = datetime.utcnow() - timedelta(days=days)
         
         result = await self.db.execute(
-            select(DownloadTask).where(
+            delete(DownloadTask).where(
                 DownloadTask.status.in_(["completed", "failed", "cancelled"]),
                 DownloadTask.created_at < cutoff
             )
         )
-        tasks = result.scalars().all()
-        
-        for task in tasks:
-            await self.db.delete(task)
         
         await self.db.commit()
         
-        return len(tasks)
+        return result.rowcount
+
+
+async def _download_worker():
+    """Claim and run pending downloads, batching requests that arrive together"""
+    # Jobs open their own sessions, so the worker's service needs none
+    service = DownloadService(db=None)
+    while True:
+        try:
+            if await service._execute_downloads():
+                # More may be pending - check again straight away
+                continue
+        except Exception as e:
+            logger.exception("Download worker error: %s", e)
+        
+        try:
+            await asyncio.wait_for(_download_wakeup.wait(), DOWNLOAD_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            continue
+        _download_wakeup.clear()
+        
+        # Let a burst of requests (e.g. a discography) land so it is claimed as one batch
+        await asyncio.sleep(DOWNLOAD_BATCH_WINDOW)
+
+
+def start_download_workers(count: int = DOWNLOAD_WORKERS):
+    """Start the background download workers"""
+    for _ in range(count - len(_download_workers)):
+        _download_workers.append(asyncio.create_task(_download_worker()))
+
+
+def stop_download_workers():
+    """Cancel the background download workers"""
+    for worker in _download_workers:
+        worker.cancel()
+    _download_workers.clear()
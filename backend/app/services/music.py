@@ -1,83 +1,193 @@
+import asyncio
+import logging
+import re
+from collections import OrderedDict, defaultdict
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, desc, func, update, delete, tuple_, or_, and_, case
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 import os
-from mutagen import File as MutagenFile
+from mutagen import File as MutagenFile, MutagenError
 from mutagen.easyid3 import EasyID3
+from mutagen.easymp4 import EasyMP4
 from mutagen.flac import FLAC
+from mutagen.mp3 import EasyMP3
+from mutagen.oggvorbis import OggVorbis
+from mutagen.wave import WAVE
 
-from app.models.music import Album, Track, Artist, PlayHistory
+from app.models.music import Album, Track, Artist, PlayHistory, ScanCacheEntry, normalize_title
 from app.schemas.music import AlbumResponse, TrackResponse
 
+logger = logging.getLogger("auvia.music")
+
+SUPPORTED_AUDIO_EXTENSIONS = {'.mp3', '.flac', '.m4a', '.ogg', '.wav'}
+# In order of preference when a directory has several
+COVER_ART_NAMES = ('cover.jpg', 'cover.jpeg', 'cover.png', 'folder.jpg', 'folder.png', 'front.jpg', 'front.png')
+_COVER_ART_RANK = {name: rank for rank, name in enumerate(COVER_ART_NAMES)}
+# For str.endswith on lowercased file names
+AUDIO_FILE_SUFFIXES = tuple(SUPPORTED_AUDIO_EXTENSIONS)
+# Metadata/thumbnail folders written by macOS and Synology NAS boxes
+IGNORED_DIRECTORY_NAMES = {'__MACOSX', '@eaDir'}
+_TRACK_NUMBER_RE = re.compile(r'\s*(\d+)')
+# Path fallbacks for files without usable tags:
+# "Artist - Album (Year)" / "Artist-Album" directory names
+_PATH_DIR_RE = re.compile(r'^(.+?)\s*-\s*(.+?)(?:\s*\(\d{4}\))?$')
+# "01. Artist - Title", "01 - Title", "01 Title" file names
+_PATH_TRACK_RE = re.compile(r'^(\d+)[.\s-]+(?:(.+?)\s*-\s*)?(.+)$')
+# "Artist - Album (Year)" directory names (spaces around the dash required)
+_ARTIST_ALBUM_DIR_RE = re.compile(r'^(.+?)\s+-\s+(.+?)(?:\s*\(\d{4}\))?$')
+_ALBUM_DIR_RE = re.compile(r'^.+?\s+-\s+(.+?)(?:\s*\(\d{4}\))?$')
+# Leading track number ("01. ", "01 - ")
+_TRACK_PREFIX_RE = re.compile(r'^\d+[.\s-]+')
+# The (easy) parser mutagen.File would pick for each extension, so the
+# header sniffing across every known format can be skipped
+_MUTAGEN_TYPES = {
+    '.mp3': EasyMP3,
+    '.flac': FLAC,
+    '.m4a': EasyMP4,
+    '.ogg': OggVorbis,
+    '.wav': WAVE,
+}
+
+# Files processed per commit during a scan
+SCAN_COMMIT_BATCH_SIZE = 500
+# File paths per existing-track lookup query
+TRACK_LOOKUP_CHUNK_SIZE = 1000
+# Scans of at least this many audio files preload all artists and albums
+SCAN_PREFETCH_MIN_FILES = 1000
+# New tracks per directory from which COPY beats a multi-row INSERT (Postgres only)
+TRACK_COPY_MIN_ROWS = 100
+# Downloaded tracks checked per chunk, and albums re-checked per query, in verify_local_files
+VERIFY_CHUNK_SIZE = 1000
+ALBUM_CHECK_CHUNK_SIZE = 500
+
+# Tag parsing is CPU-bound and holds the GIL, so it runs in worker processes;
+# each directory's files are split across the workers
+METADATA_WORKERS = min(8, os.cpu_count() or 1)
+_metadata_pool: Optional[ProcessPoolExecutor] = None
+
+# Parsed metadata by file path, reused while the file's (mtime_ns, size) is
+# unchanged - rescans of an unchanged library skip tag parsing entirely
+METADATA_CACHE_SIZE = 100_000
+_metadata_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _get_metadata_pool() -> ProcessPoolExecutor:
+    """Start the metadata worker processes on first use"""
+    global _metadata_pool
+    if _metadata_pool is None:
+        # spawn rather than fork - the server process has running threads and an event loop
+        _metadata_pool = ProcessPoolExecutor(
+            max_workers=METADATA_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _metadata_pool
+
+
+def shutdown_metadata_pool():
+    """Stop the metadata worker processes"""
+    global _metadata_pool
+    if _metadata_pool is not None:
+        _metadata_pool.shutdown(wait=False, cancel_futures=True)
+        _metadata_pool = None
+
+
+def _read_files_metadata(root: str, filenames: List[str]) -> List[Optional[dict]]:
+    """Worker process entry point: read the metadata of some files in one directory"""
+    service = MusicService(None)
+    return [service._read_file_metadata(root, filename) for filename in filenames]
+
+
+def _stat_files(file_paths: List[str]) -> List[Optional[tuple]]:
+    """(mtime_ns, size) of each file, or None if it can't be stat'ed (blocking)"""
+    file_stats = []
+    for file_path in file_paths:
+        try:
+            st = os.stat(file_path)
+            file_stats.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            file_stats.append(None)
+    return file_stats
+
+
+def _is_audio_file(filename: str) -> bool:
+    """Check a file name's extension without building a splitext tuple"""
+    return filename.lower().endswith(AUDIO_FILE_SUFFIXES)
+
 
 class MusicService:
     """Service for managing local music library"""
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        # Directory -> file names, so parent directories aren't probed repeatedly
+        self._dir_listing_cache = {}
     
     async def get_recently_played(self, limit: int = 20) -> List[TrackResponse]:
         """Get recently played tracks"""
+        # One row per track, newest play first - de-duplicated in the database
+        # so repeated plays of one track don't crowd out the rest of the list
+        last_played = (
+            select(PlayHistory.track_id, func.max(PlayHistory.played_at).label("played_at"))
+            .group_by(PlayHistory.track_id)
+            .subquery()
+        )
+        # Only the columns the response needs - no ORM objects to build
         result = await self.db.execute(
-            select(PlayHistory)
-            .options(
-                selectinload(PlayHistory.track).selectinload(Track.artist),
-                selectinload(PlayHistory.track).selectinload(Track.album)
+            select(
+                Track.id,
+                Track.title,
+                Artist.name.label("artist_name"),
+                Album.title.label("album_title"),
+                Track.duration,
+                Track.is_downloaded,
+                Track.play_count,
+                Album.cover_art_url
             )
-            .order_by(desc(PlayHistory.played_at))
+            .join(last_played, last_played.c.track_id == Track.id)
+            .join(Artist, Track.artist_id == Artist.id)
+            .join(Album, Track.album_id == Album.id)
+            .order_by(desc(last_played.c.played_at))
             .limit(limit)
         )
-        history = result.scalars().all()
-        
-        seen_tracks = set()
-        tracks = []
-        
-        for item in history:
-            if item.track_id not in seen_tracks:
-                seen_tracks.add(item.track_id)
-                tracks.append(TrackResponse(
-                    id=item.track.id,
-                    title=item.track.title,
-                    artist_name=item.track.artist.name,
-                    album_title=item.track.album.title,
-                    duration=item.track.duration,
-                    duration_formatted=self._format_duration(item.track.duration),
-                    is_downloaded=item.track.is_downloaded,
-                    play_count=item.track.play_count,
-                    cover_art_url=item.track.album.cover_art_url
-                ))
         
-        return tracks
+        # Trusted DB data - skip field validation
+        return [
+            TrackResponse.model_construct(
+                **row,
+                duration_formatted=self._format_duration(row["duration"])
+            )
+            for row in result.mappings()
+        ]
     
     async def get_recently_added_albums(self, limit: int = 10) -> List[AlbumResponse]:
         """Get recently added/downloaded albums"""
         result = await self.db.execute(
-            select(Album)
-            .options(selectinload(Album.artist))
+            select(
+                Album.id,
+                Album.title,
+                Artist.name.label("artist_name"),
+                Album.artist_id,
+                Album.qobuz_id,
+                Album.qobuz_url,
+                Album.cover_art_url,
+                Album.cover_art_local,
+                Album.release_date,
+                Album.genre,
+                Album.total_tracks,
+                Album.is_downloaded
+            )
+            .join(Artist, Album.artist_id == Artist.id)
             .where(Album.is_downloaded == True)
             .order_by(desc(Album.created_at))
             .limit(limit)
         )
-        albums = result.scalars().all()
         
-        return [
-            AlbumResponse(
-                id=album.id,
-                title=album.title,
-                artist_name=album.artist.name,
-                artist_id=album.artist_id,
-                qobuz_id=album.qobuz_id,
-                qobuz_url=album.qobuz_url,
-                cover_art_url=album.cover_art_url,
-                cover_art_local=album.cover_art_local,
-                release_date=album.release_date,
-                genre=album.genre,
-                total_tracks=album.total_tracks,
-                is_downloaded=album.is_downloaded
-            )
-            for album in albums
-        ]
+        # Trusted DB data - skip field validation
+        return [AlbumResponse.model_construct(**row) for row in result.mappings()]
     
     async def get_or_create_artist(self, name: str, qobuz_id: str = None) -> Artist:
         """Get existing artist or create new one"""
@@ -105,12 +215,10 @@ class MusicService:
         if not artist:
             artist = Artist(name=name, qobuz_id=qobuz_id)
             self.db.add(artist)
-            await self.db.commit()
-            await self.db.refresh(artist)
+            await self.db.flush()
         elif qobuz_id and not artist.qobuz_id:
             # Update existing artist with qobuz_id if we have it now
             artist.qobuz_id = qobuz_id
-            await self.db.commit()
         
         return artist
     
@@ -157,8 +265,7 @@ class MusicService:
                 genre=genre
             )
             self.db.add(album)
-            await self.db.commit()
-            await self.db.refresh(album)
+            await self.db.flush()
         
         return album
     
@@ -179,69 +286,84 @@ class MusicService:
             # Extract from filename as fallback
             title = os.path.splitext(os.path.basename(file_path))[0] if file_path else "Unknown Track"
         
-        # Check if track already exists by qobuz_id
+        # Check if track already exists by qobuz_id - relinked to this file in
+        # the same statement that finds it
         if qobuz_id:
             result = await self.db.execute(
-                select(Track).where(Track.qobuz_id == qobuz_id)
+                update(Track)
+                .where(Track.qobuz_id == qobuz_id)
+                .values(file_path=file_path, is_downloaded=True)
+                .returning(Track),
+                execution_options={"populate_existing": True}
             )
             track = result.scalar_one_or_none()
             if track:
-                track.file_path = file_path
-                track.is_downloaded = True
-                await self.db.commit()
                 return track
         
-        # Check if track already exists by file_path
+        # One lookup for both ways a file can already be known: by its path,
+        # or as the same album/track number/title at another path (moved or
+        # re-downloaded) - a path match wins
         result = await self.db.execute(
-            select(Track).where(Track.file_path == file_path)
+            select(Track)
+            .where(or_(
+                Track.file_path == file_path,
+                and_(
+                    Track.album_id == album.id,
+                    Track.track_number == track_number,
+                    Track.title == title
+                )
+            ))
+            .order_by(case((Track.file_path == file_path, 0), else_=1))
+            .limit(1)
         )
         track = result.scalar_one_or_none()
-        if track:
-            # Update existing track - including artist/album if they were wrong
-            track.title = title
-            track.track_number = track_number
-            track.disc_number = disc_number
-            track.duration = duration
+        if track and track.file_path != file_path:
+            track.file_path = file_path
             track.is_downloaded = True
-            # Fix artist/album if we now have better data
-            if artist and artist.name != "Unknown Artist":
-                track.artist_id = artist.id
-            if album and album.artist_id == artist.id:
-                track.album_id = album.id
-            await self.db.commit()
             return track
         
-        # Check by album, track number, and title to avoid duplicates
-        result = await self.db.execute(
-            select(Track).where(
-                Track.album_id == album.id,
-                Track.track_number == track_number,
-                Track.title == title
-            )
-        )
-        track = result.scalar_one_or_none()
+        # Update existing track - including artist/album if they were wrong
+        update_values = {
+            "title": title,
+            "title_normalized": normalize_title(title),
+            "track_number": track_number,
+            "disc_number": disc_number,
+            "duration": duration,
+            "is_downloaded": True
+        }
+        # Fix artist/album if we now have better data
+        if artist and artist.name != "Unknown Artist":
+            update_values["artist_id"] = artist.id
+        if album and album.artist_id == artist.id:
+            update_values["album_id"] = album.id
+        
         if track:
-            track.file_path = file_path
-            track.is_downloaded = True
-            await self.db.commit()
+            for key, value in update_values.items():
+                setattr(track, key, value)
             return track
         
-        track = Track(
-            title=title,
-            artist_id=artist.id,
-            album_id=album.id,
-            qobuz_id=qobuz_id,
-            track_number=track_number,
-            disc_number=disc_number,
-            duration=duration,
-            file_path=file_path,
-            is_downloaded=True
+        # New file - upsert on the path in case a concurrent scan (e.g. the
+        # post-download scan and a library rescan) inserted it first
+        result = await self.db.execute(
+            pg_insert(Track)
+            .values(
+                title=title,
+                # Core inserts bypass the @validates hook that normally fills this in
+                title_normalized=normalize_title(title),
+                artist_id=artist.id,
+                album_id=album.id,
+                qobuz_id=qobuz_id,
+                track_number=track_number,
+                disc_number=disc_number,
+                duration=duration,
+                file_path=file_path,
+                is_downloaded=True
+            )
+            .on_conflict_do_update(index_elements=[Track.file_path], set_=update_values)
+            .returning(Track),
+            execution_options={"populate_existing": True}
         )
-        self.db.add(track)
-        await self.db.commit()
-        await self.db.refresh(track)
-        
-        return track
+        return result.scalar_one()
     
     async def scan_directory(self, directory: str, qobuz_album_id: str = None, qobuz_url: str = None) -> dict:
         """
@@ -252,51 +374,82 @@ class MusicService:
             qobuz_album_id: Optional Qobuz album ID to link with scanned album
             qobuz_url: Optional Qobuz URL to link with scanned album
         """
-        stats = {"albums": 0, "tracks": 0, "errors": 0}
-        
-        supported_extensions = {'.mp3', '.flac', '.m4a', '.ogg', '.wav'}
-        cover_names = {'cover.jpg', 'cover.jpeg', 'cover.png', 'folder.jpg', 'folder.png', 'front.jpg', 'front.png'}
+        stats = {"albums": 0, "tracks": 0, "errors": 0, "unchanged": 0}
         
         # Track which albums we've processed to update cover art
         processed_albums = {}
+        files_since_commit = 0
+        
+        # Artists/albums already resolved in this scan - most files of a tree
+        # share a handful of them, so skip the lookup queries for repeats.
+        # Keyed by lowercased artist name and by (artist id, album title)
+        artists_by_name = {}
+        albums_by_key = {}
+        
+        # Walking the tree and reading tags is blocking file I/O - keep it off the event loop
+        walk = await asyncio.to_thread(self._walk_directory, directory)
+        self._dir_listing_cache = {root: files for root, dirs, files in walk}
         
-        for root, dirs, files in os.walk(directory):
-            # Look for cover art in this directory
-            cover_art_path = None
-            for f in files:
-                if f.lower() in cover_names:
-                    cover_art_path = os.path.join(root, f)
-                    break
+        # Look up every track already in the library for this tree up front,
+        # instead of once per directory (or once per file)
+        audio_paths = [
+            os.path.join(root, filename)
+            for root, dirs, files in walk
+            for filename in files
+            if _is_audio_file(filename)
+        ]
+        known_tracks = await self._load_tracks_by_path(audio_paths)
+        
+        # Files still in the library and unchanged (same mtime and size) since
+        # the scan that last read them are skipped. A scan linking the album to
+        # Qobuz goes through every file, since each one carries the album
+        unchanged_files = {}
+        if not qobuz_album_id and not qobuz_url:
+            scan_cache = await self._load_scan_cache(audio_paths)
+            unchanged_files = {
+                path: file_stat for path, file_stat in scan_cache.items()
+                if path in known_tracks and known_tracks[path].is_downloaded
+            }
+        
+        # A library-wide scan touches most artists and albums - load them all
+        # in two queries instead of resolving them one at a time. (Album scans
+        # linked to a Qobuz id keep get_or_create_album's qobuz_id lookup.)
+        if len(audio_paths) >= SCAN_PREFETCH_MIN_FILES and not qobuz_album_id:
+            result = await self.db.execute(select(Artist))
+            for artist in result.scalars():
+                artists_by_name.setdefault(artist.name.strip().lower(), artist)
+            result = await self.db.execute(select(Album))
+            for album in result.scalars():
+                albums_by_key.setdefault((album.artist_id, album.title), album)
+        
+        # Metadata for the next directory is read in the worker processes while
+        # this directory's rows are written, so neither side waits on the other
+        directories = [(root, files) for root, dirs, files in walk if files]
+        next_parse = None
+        if directories:
+            next_parse = asyncio.ensure_future(
+                self._parse_directory_files(directory, *directories[0], unchanged_files)
+            )
+        
+        for index, (root, files) in enumerate(directories):
+            parsed_files, unchanged = await next_parse
+            stats["unchanged"] += unchanged
+            if index + 1 < len(directories):
+                next_parse = asyncio.ensure_future(
+                    self._parse_directory_files(directory, *directories[index + 1], unchanged_files)
+                )
             
-            # For multi-disc albums, also check parent directory for cover art
-            if not cover_art_path:
-                parent_dir = os.path.dirname(root)
-                if parent_dir and parent_dir != directory:
-                    for cover_name in cover_names:
-                        parent_cover = os.path.join(parent_dir, cover_name)
-                        if os.path.exists(parent_cover):
-                            cover_art_path = parent_cover
-                            break
+            # Tracks of this directory, added together once artists/albums are resolved
+            track_entries = []
+            file_stats = {}
             
-            for filename in files:
-                ext = os.path.splitext(filename)[1].lower()
-                if ext not in supported_extensions:
+            for filename, file_path, file_stat, cover_art_path, metadata in parsed_files:
+                if not metadata:
+                    logger.warning("Could not extract any metadata from %s", file_path)
+                    stats["errors"] += 1
                     continue
                 
-                file_path = os.path.join(root, filename)
-                
                 try:
-                    metadata = self._extract_metadata(file_path)
-                    
-                    # If metadata extraction failed, try to parse from filename/folder
-                    if not metadata:
-                        metadata = self._extract_metadata_from_path(file_path, filename, root)
-                    
-                    if not metadata:
-                        print(f"Could not extract any metadata from {file_path}")
-                        stats["errors"] += 1
-                        continue
-                    
                     # Ensure all required fields have valid values (not None or empty)
                     artist_name = metadata.get("artist")
                     album_title = metadata.get("album")
@@ -314,17 +467,34 @@ class MusicService:
                     if not track_title or (isinstance(track_title, str) and not track_title.strip()):
                         track_title = self._clean_filename_for_title(filename)
                     
-                    # Get or create artist
-                    artist = await self.get_or_create_artist(artist_name)
+                    # Artists match case-insensitively (as get_or_create_artist
+                    # does), album titles exactly
+                    artist_key = artist_name.strip().lower()
+                    artist = artists_by_name.get(artist_key)
+                    album = albums_by_key.get((artist.id, album_title)) if artist else None
                     
-                    # Get or create album (link with qobuz_id if provided)
-                    album = await self.get_or_create_album(
-                        title=album_title,
-                        artist=artist,
-                        qobuz_id=qobuz_album_id,
-                        qobuz_url=qobuz_url,
-                        genre=metadata.get("genre")
-                    )
+                    if album is None:
+                        # Savepoint per lookup: a failing file doesn't undo the rest
+                        # of the batch. Files whose artist and album were already
+                        # resolved skip it (and its two round-trips) entirely
+                        async with self.db.begin_nested():
+                            # Get or create artist
+                            if artist is None:
+                                artist = await self.get_or_create_artist(artist_name)
+                            
+                            # Get or create album (link with qobuz_id if provided)
+                            album = await self.get_or_create_album(
+                                title=album_title,
+                                artist=artist,
+                                qobuz_id=qobuz_album_id,
+                                qobuz_url=qobuz_url,
+                                genre=metadata.get("genre")
+                            )
+                        
+                        # Only cache once the savepoint has committed, so a rolled
+                        # back artist/album is never reused
+                        artists_by_name[artist_key] = artist
+                        albums_by_key[(artist.id, album_title)] = album
                     
                     # Update qobuz_id if not set but we have it
                     if qobuz_album_id and not album.qobuz_id:
@@ -340,45 +510,408 @@ class MusicService:
                     # Update cover art path if found and not already set
                     if cover_art_path and not album.cover_art_local:
                         album.cover_art_local = cover_art_path
-                        print(f"Found cover art for {album.title}: {cover_art_path}")
+                        logger.debug("Found cover art for %s: %s", album.title, cover_art_path)
                     
                     # Track this album
                     processed_albums[album.id] = album
                     
-                    # Add track
-                    await self.add_track(
-                        title=track_title,
-                        artist=artist,
-                        album=album,
-                        file_path=file_path,
-                        track_number=metadata.get("tracknumber"),
-                        disc_number=metadata.get("discnumber") or 1,
-                        duration=metadata.get("duration")
-                    )
-                    
-                    stats["tracks"] += 1
+                    track_entries.append({
+                        "title": track_title,
+                        "artist": artist,
+                        "album": album,
+                        "file_path": file_path,
+                        "track_number": metadata.get("tracknumber"),
+                        "disc_number": metadata.get("discnumber") or 1,
+                        "duration": metadata.get("duration")
+                    })
+                    file_stats[file_path] = file_stat
                     
                 except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
+                    # The savepoint was rolled back, so only this file's changes are lost
+                    logger.error("Error processing %s: %s", file_path, e)
                     stats["errors"] += 1
-                    # Rollback to recover from database errors
+            
+            if not track_entries:
+                continue
+            
+            try:
+                async with self.db.begin_nested():
+                    await self._add_tracks_bulk(track_entries, known_tracks)
+                stats["tracks"] += len(track_entries)
+                added_paths = list(file_stats)
+            except Exception as e:
+                # Fall back to adding this directory's tracks one by one
+                logger.warning("Bulk track insert failed for %s, adding individually: %s", root, e)
+                added_paths = []
+                for entry in track_entries:
                     try:
-                        await self.db.rollback()
-                    except:
-                        pass
+                        async with self.db.begin_nested():
+                            await self.add_track(**entry)
+                        stats["tracks"] += 1
+                        added_paths.append(entry["file_path"])
+                    except Exception as e:
+                        logger.error("Error processing %s: %s", entry["file_path"], e)
+                        stats["errors"] += 1
+            
+            # Remember what was read so the next scan can skip these files
+            scanned = [(path, file_stats[path]) for path in added_paths if file_stats[path]]
+            if scanned:
+                try:
+                    async with self.db.begin_nested():
+                        await self._save_scan_cache(scanned)
+                except Exception as e:
+                    logger.warning("Could not update scan cache for %s: %s", root, e)
+            
+            files_since_commit += len(track_entries)
+            if files_since_commit >= SCAN_COMMIT_BATCH_SIZE:
+                await self.db.commit()
+                files_since_commit = 0
         
         try:
             await self.db.commit()
         except Exception as e:
-            print(f"Error committing scan results: {e}")
+            logger.error("Error committing scan results: %s", e)
             await self.db.rollback()
-        print(f"Scan complete: {stats}")
+        logger.info("Scan complete: %s", stats)
         return stats
     
+    async def _load_tracks_by_path(self, paths: List[str]) -> dict:
+        """Get existing tracks for the given file paths, keyed by path"""
+        tracks = {}
+        # Chunked to stay well below the driver's bind parameter limit
+        for i in range(0, len(paths), TRACK_LOOKUP_CHUNK_SIZE):
+            result = await self.db.execute(
+                select(Track).where(Track.file_path.in_(paths[i:i + TRACK_LOOKUP_CHUNK_SIZE]))
+            )
+            for track in result.scalars():
+                tracks[track.file_path] = track
+        return tracks
+    
+    async def _load_scan_cache(self, paths: List[str]) -> dict:
+        """(mtime_ns, size) recorded for the given file paths, keyed by path"""
+        scan_cache = {}
+        for i in range(0, len(paths), TRACK_LOOKUP_CHUNK_SIZE):
+            result = await self.db.execute(
+                select(ScanCacheEntry.path, ScanCacheEntry.mtime_ns, ScanCacheEntry.size)
+                .where(ScanCacheEntry.path.in_(paths[i:i + TRACK_LOOKUP_CHUNK_SIZE]))
+            )
+            for path, mtime_ns, size in result:
+                scan_cache[path] = (mtime_ns, size)
+        return scan_cache
+    
+    async def _save_scan_cache(self, scanned: List[tuple]):
+        """Record the (mtime_ns, size) each file had when it was read"""
+        stmt = pg_insert(ScanCacheEntry)
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ScanCacheEntry.path],
+                set_={
+                    "mtime_ns": stmt.excluded.mtime_ns,
+                    "size": stmt.excluded.size,
+                    "last_seen": func.now()
+                }
+            ),
+            [
+                {"path": path, "mtime_ns": mtime_ns, "size": size}
+                for path, (mtime_ns, size) in scanned
+            ]
+        )
+    
+    async def _add_tracks_bulk(self, entries: List[dict], by_path: dict):
+        """
+        Add or update the tracks of one scanned directory with a few set-based
+        statements instead of add_track()'s per-file lookups.
+        Entries take the same fields as add_track(); by_path holds the existing
+        tracks for these files (see _load_tracks_by_path).
+        """
+        # Tracks already known by file path are updated in place
+        new_entries = []
+        for entry in entries:
+            track = by_path.get(entry["file_path"])
+            if not track:
+                new_entries.append(entry)
+                continue
+            
+            # Update existing track - including artist/album if they were wrong
+            artist, album = entry["artist"], entry["album"]
+            track.title = entry["title"]
+            track.track_number = entry["track_number"]
+            track.disc_number = entry["disc_number"]
+            track.duration = entry["duration"]
+            track.is_downloaded = True
+            # Fix artist/album if we now have better data
+            if artist and artist.name != "Unknown Artist":
+                track.artist_id = artist.id
+            if album and album.artist_id == artist.id:
+                track.album_id = album.id
+        
+        if not new_entries:
+            return
+        
+        # Tracks moved to a new path are matched by album, track number, and title
+        keys = [
+            (e["album"].id, e["track_number"], e["title"])
+            for e in new_entries if e["track_number"] is not None
+        ]
+        by_key = {}
+        if keys:
+            result = await self.db.execute(
+                select(Track).where(tuple_(Track.album_id, Track.track_number, Track.title).in_(keys))
+            )
+            by_key = {(t.album_id, t.track_number, t.title): t for t in result.scalars()}
+        
+        rows = []
+        for entry in new_entries:
+            if entry["track_number"] is None:
+                # NULL never matches in the tuple lookup above - use the single-track path
+                await self.add_track(**entry)
+                continue
+            
+            track = by_key.get((entry["album"].id, entry["track_number"], entry["title"]))
+            if track:
+                track.file_path = entry["file_path"]
+                track.is_downloaded = True
+                continue
+            
+            rows.append({
+                "title": entry["title"],
+                # Core inserts bypass the @validates hook that normally fills this in
+                "title_normalized": normalize_title(entry["title"]),
+                "artist_id": entry["artist"].id,
+                "album_id": entry["album"].id,
+                "track_number": entry["track_number"],
+                "disc_number": entry["disc_number"],
+                "duration": entry["duration"],
+                "file_path": entry["file_path"],
+                "is_downloaded": True
+            })
+        
+        if not rows:
+            return
+        
+        if len(rows) >= TRACK_COPY_MIN_ROWS and self.db.bind.dialect.name == "postgresql":
+            await self._copy_tracks(rows)
+        else:
+            # One multi-row INSERT (insertmanyvalues) for all new tracks; a path
+            # inserted meanwhile by a concurrent scan is updated instead
+            stmt = pg_insert(Track)
+            await self.db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[Track.file_path],
+                    set_={
+                        column: stmt.excluded[column]
+                        for column in rows[0] if column != "file_path"
+                    }
+                ),
+                rows
+            )
+    
+    async def _copy_tracks(self, rows: List[dict]):
+        """Insert track rows with asyncpg's COPY, inside the session's transaction"""
+        # COPY only applies server defaults, so fill in the client-side ones
+        rows = [{"play_count": 0, **row} for row in rows]
+        columns = list(rows[0])
+        
+        conn = await self.db.connection()
+        raw_conn = await conn.get_raw_connection()
+        await raw_conn.driver_connection.copy_records_to_table(
+            Track.__tablename__,
+            records=[tuple(row[c] for c in columns) for row in rows],
+            columns=columns
+        )
+    
+    @staticmethod
+    def _walk_directory(directory: str) -> List[tuple]:
+        """
+        Walk a tree top-down with os.scandir, like os.walk (blocking).
+        Hidden entries (including macOS "._" resource forks, which carry audio
+        extensions) and IGNORED_DIRECTORY_NAMES are left out.
+        Returns [(root, dirnames, filenames)]
+        """
+        walk = []
+        stack = [directory]
+        while stack:
+            root = stack.pop()
+            dirs, files, subdirs = [], [], []
+            try:
+                with os.scandir(root) as entries:
+                    for entry in entries:
+                        if entry.name.startswith('.'):
+                            continue
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        if is_dir:
+                            if entry.name in IGNORED_DIRECTORY_NAMES:
+                                continue
+                            dirs.append(entry.name)
+                            # Like os.walk, list symlinked directories but don't descend into them
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        else:
+                            files.append(entry.name)
+            except OSError:
+                continue
+            walk.append((root, dirs, files))
+            stack.extend(reversed(subdirs))
+        return walk
+    
+    async def _parse_directory_files(
+        self,
+        directory: str,
+        root: str,
+        files: List[str],
+        unchanged_files: dict = None
+    ) -> tuple:
+        """
+        Find cover art and read metadata for the audio files of one directory,
+        reading the files in parallel in the metadata worker processes.
+        Files whose (mtime_ns, size) matches unchanged_files are left out.
+        Returns ([(filename, file_path, file_stat, cover_art_path, metadata)], unchanged count)
+        """
+        # One pass over the listing, lowercasing each name once for both checks
+        audio_files = []
+        cover_art_name = None
+        cover_art_rank = len(COVER_ART_NAMES)
+        for filename in files:
+            name_lower = filename.lower()
+            if name_lower.endswith(AUDIO_FILE_SUFFIXES):
+                audio_files.append(filename)
+                continue
+            rank = _COVER_ART_RANK.get(name_lower)
+            if rank is not None and rank < cover_art_rank:
+                cover_art_name, cover_art_rank = filename, rank
+        if not audio_files:
+            return [], 0
+        
+        file_paths = [os.path.join(root, filename) for filename in audio_files]
+        file_stats = await asyncio.to_thread(_stat_files, file_paths)
+        
+        unchanged = 0
+        if unchanged_files:
+            changed = [
+                i for i, (file_path, file_stat) in enumerate(zip(file_paths, file_stats))
+                if file_stat is None or unchanged_files.get(file_path) != file_stat
+            ]
+            unchanged = len(audio_files) - len(changed)
+            audio_files = [audio_files[i] for i in changed]
+            file_paths = [file_paths[i] for i in changed]
+            file_stats = [file_stats[i] for i in changed]
+            if not audio_files:
+                return [], unchanged
+        
+        cover_art_path = os.path.join(root, cover_art_name) if cover_art_name else None
+        
+        metadata = await self._read_files_metadata(root, audio_files, file_stats)
+        
+        if cover_art_path is None:
+            cover_art_path = await asyncio.to_thread(self._find_parent_cover_art, directory, root)
+        
+        return [
+            (filename, file_path, file_stat, cover_art_path, file_metadata)
+            for filename, file_path, file_stat, file_metadata
+            in zip(audio_files, file_paths, file_stats, metadata)
+        ], unchanged
+    
+    async def _read_files_metadata(
+        self,
+        root: str,
+        filenames: List[str],
+        file_stats: List[Optional[tuple]]
+    ) -> List[Optional[dict]]:
+        """
+        Read metadata for files of one directory. Files unchanged since they were
+        last read (same mtime and size, see _stat_files) come from the metadata cache.
+        """
+        file_paths = [os.path.join(root, filename) for filename in filenames]
+        
+        metadata = [None] * len(filenames)
+        to_read = []
+        for i, (file_path, file_stat) in enumerate(zip(file_paths, file_stats)):
+            cached = _metadata_cache.get(file_path)
+            if file_stat and cached and cached[0] == file_stat:
+                _metadata_cache.move_to_end(file_path)
+                metadata[i] = cached[1]
+            else:
+                to_read.append(i)
+        
+        if to_read:
+            read_metadata = await self._parse_files_metadata(root, [filenames[i] for i in to_read])
+            for i, file_metadata in zip(to_read, read_metadata):
+                metadata[i] = file_metadata
+                if file_stats[i] and file_metadata:
+                    _metadata_cache[file_paths[i]] = (file_stats[i], file_metadata)
+                    _metadata_cache.move_to_end(file_paths[i])
+            while len(_metadata_cache) > METADATA_CACHE_SIZE:
+                _metadata_cache.popitem(last=False)
+        
+        return metadata
+    
+    async def _parse_files_metadata(self, root: str, filenames: List[str]) -> List[Optional[dict]]:
+        """Parse metadata for files of one directory, split across the worker processes"""
+        chunk_size = -(-len(filenames) // METADATA_WORKERS)
+        chunks = [filenames[i:i + chunk_size] for i in range(0, len(filenames), chunk_size)]
+        
+        loop = asyncio.get_running_loop()
+        try:
+            pool = _get_metadata_pool()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, _read_files_metadata, root, chunk)
+                for chunk in chunks
+            ))
+        except BrokenProcessPool as e:
+            # A worker died (e.g. crashed on a malformed file) - restart the pool
+            # next time and read this directory in a thread instead
+            logger.warning("Metadata worker pool failed, reading %s in-process: %s", root, e)
+            shutdown_metadata_pool()
+            return await asyncio.to_thread(
+                lambda: [self._read_file_metadata(root, filename) for filename in filenames]
+            )
+        
+        return [metadata for chunk_metadata in results for metadata in chunk_metadata]
+    
+    def _find_parent_cover_art(self, directory: str, root: str) -> Optional[str]:
+        """For multi-disc albums, find cover art in the parent directory (blocking)"""
+        parent_dir = os.path.dirname(root)
+        if parent_dir and parent_dir != directory:
+            # Lowercased name -> name on disk
+            names = {f.lower(): f for f in self._list_directory(parent_dir)}
+            for cover_name in COVER_ART_NAMES:
+                if cover_name in names:
+                    return os.path.join(parent_dir, names[cover_name])
+        
+        return None
+    
+    def _list_directory(self, path: str) -> List[str]:
+        """List a directory once per scan (blocking)"""
+        listing = self._dir_listing_cache.get(path)
+        if listing is None:
+            try:
+                listing = os.listdir(path)
+            except OSError:
+                listing = []
+            self._dir_listing_cache[path] = listing
+        return listing
+    
+    def _read_file_metadata(self, root: str, filename: str) -> Optional[dict]:
+        """Read an audio file's metadata, falling back to its path (blocking)"""
+        file_path = os.path.join(root, filename)
+        try:
+            metadata = self._extract_metadata(file_path)
+            
+            # If metadata extraction failed, try to parse from filename/folder
+            if not metadata:
+                metadata = self._extract_metadata_from_path(file_path, filename, root)
+            return metadata
+        except Exception as e:
+            logger.warning("Error reading metadata from %s: %s", file_path, e)
+            return None
+    
     def _extract_metadata(self, file_path: str) -> Optional[dict]:
         """Extract metadata from an audio file"""
         try:
-            audio = MutagenFile(file_path, easy=True)
+            audio = self._open_audio_file(file_path)
             
             if audio is None:
                 return None
@@ -396,9 +929,21 @@ class MusicService:
             return metadata
             
         except Exception as e:
-            print(f"Error extracting metadata from {file_path}: {e}")
+            logger.warning("Error extracting metadata from %s: %s", file_path, e)
             return None
     
+    @staticmethod
+    def _open_audio_file(file_path: str):
+        """Open an audio file with the parser for its extension"""
+        file_type = _MUTAGEN_TYPES.get(file_path[file_path.rfind('.'):].lower())
+        if file_type:
+            try:
+                return file_type(file_path)
+            except MutagenError:
+                # Content doesn't match the extension (e.g. Opus in .ogg) - let mutagen sniff it
+                pass
+        return MutagenFile(file_path, easy=True)
+    
     def _get_tag(self, audio, tag_name: str) -> Optional[str]:
         """Get a tag value from audio metadata"""
         try:
@@ -413,13 +958,9 @@ class MusicService:
         """Parse track number from string (handles '1/12' format)"""
         if not value:
             return None
-        try:
-            # Handle "1/12" format
-            if "/" in str(value):
-                value = str(value).split("/")[0]
-            return int(value)
-        except:
-            return None
+        # Leading digits only - "1/12" -> 1, no exception when tags are junk
+        match = _TRACK_NUMBER_RE.match(value if isinstance(value, str) else str(value))
+        return int(match.group(1)) if match else None
     
     def _extract_metadata_from_path(self, file_path: str, filename: str, directory: str) -> Optional[dict]:
         """
@@ -428,8 +969,6 @@ class MusicService:
         - "Artist - Album (Year)/01. Artist - Title.mp3"
         - "Artist - Album/01 Title.mp3"
         """
-        import re
-        
         try:
             # Try to get duration even if tags failed
             duration = None
@@ -446,7 +985,7 @@ class MusicService:
             album_name = None
             
             # Pattern: "Artist - Album (Year)" or "Artist - Album"
-            dir_match = re.match(r'^(.+?)\s*-\s*(.+?)(?:\s*\(\d{4}\))?$', dir_name)
+            dir_match = _PATH_DIR_RE.match(dir_name)
             if dir_match:
                 artist_name = dir_match.group(1).strip()
                 album_name = dir_match.group(2).strip()
@@ -460,7 +999,7 @@ class MusicService:
             track_title = None
             
             # Pattern: "01. Artist - Title" or "01 - Title" or "01 Title"
-            track_match = re.match(r'^(\d+)[.\s-]+(?:(.+?)\s*-\s*)?(.+)$', base_name)
+            track_match = _PATH_TRACK_RE.match(base_name)
             if track_match:
                 track_number = int(track_match.group(1))
                 if track_match.group(2):
@@ -482,16 +1021,15 @@ class MusicService:
             }
             
         except Exception as e:
-            print(f"Error extracting metadata from path {file_path}: {e}")
+            logger.warning("Error extracting metadata from path %s: %s", file_path, e)
             return None
     
     def _extract_artist_album_from_path(self, directory: str) -> tuple:
         """Extract artist and album from directory path (e.g., 'Artist - Album (Year)')"""
-        import re
         dir_name = os.path.basename(directory)
         
         # Pattern: "Artist - Album (Year)" or "Artist - Album"
-        match = re.match(r'^(.+?)\s+-\s+(.+?)(?:\s*\(\d{4}\))?$', dir_name)
+        match = _ARTIST_ALBUM_DIR_RE.match(dir_name)
         if match:
             return match.group(1).strip(), match.group(2).strip()
         
@@ -500,11 +1038,10 @@ class MusicService:
     
     def _extract_album_from_path(self, directory: str) -> Optional[str]:
         """Extract album name from directory path"""
-        import re
         dir_name = os.path.basename(directory)
         
         # Pattern: "Artist - Album (Year)" -> extract Album
-        match = re.match(r'^.+?\s+-\s+(.+?)(?:\s*\(\d{4}\))?$', dir_name)
+        match = _ALBUM_DIR_RE.match(dir_name)
         if match:
             return match.group(1).strip()
         
@@ -513,12 +1050,11 @@ class MusicService:
     
     def _clean_filename_for_title(self, filename: str) -> str:
         """Clean filename to use as track title"""
-        import re
         # Remove extension
         base = os.path.splitext(filename)[0]
         
         # Remove track number prefix (e.g., "01. ", "01 - ")
-        base = re.sub(r'^\d+[.\s-]+', '', base)
+        base = _TRACK_PREFIX_RE.sub('', base)
         
         # Remove artist prefix if present (e.g., "Artist - ")
         if ' - ' in base:
@@ -536,6 +1072,26 @@ class MusicService:
         secs = seconds % 60
         return f"{minutes}:{secs:02d}"
     
+    @staticmethod
+    def _find_missing_files(file_paths: List[str]) -> set:
+        """Return the paths that no longer exist, listing each directory once (blocking)"""
+        by_dir = defaultdict(list)
+        for file_path in file_paths:
+            by_dir[os.path.dirname(file_path)].append(file_path)
+        
+        missing = set()
+        for directory, paths in by_dir.items():
+            try:
+                names = set(os.listdir(directory))
+            except (FileNotFoundError, NotADirectoryError):
+                names = set()
+            except OSError:
+                # Unreadable directory - fall back to checking files one by one
+                missing.update(p for p in paths if not os.path.exists(p))
+                continue
+            missing.update(p for p in paths if os.path.basename(p) not in names)
+        return missing
+    
     async def verify_local_files(self) -> dict:
         """
         Verify that all downloaded tracks still exist on disk.
@@ -544,69 +1100,125 @@ class MusicService:
         """
         stats = {"verified": 0, "missing_tracks": 0, "missing_albums": 0}
         
-        # Check all tracks marked as downloaded
-        result = await self.db.execute(
-            select(Track).where(Track.is_downloaded == True)
+        # Check all tracks marked as downloaded - streamed in chunks of columns
+        # (ordered by path so a directory's files land in the same chunk)
+        # rather than loading every Track object at once
+        missing_tracks = []
+        result = await self.db.stream(
+            select(Track.id, Track.file_path, Track.album_id)
+            .where(Track.is_downloaded == True)
+            .order_by(Track.file_path)
+            .execution_options(yield_per=VERIFY_CHUNK_SIZE)
         )
-        tracks = result.scalars().all()
-        
-        albums_to_check = set()
-        
-        for track in tracks:
-            if track.file_path and not os.path.exists(track.file_path):
-                print(f"Missing track file: {track.file_path}")
-                track.is_downloaded = False
-                track.file_path = None
-                stats["missing_tracks"] += 1
-                if track.album_id:
-                    albums_to_check.add(track.album_id)
-            else:
-                stats["verified"] += 1
+        async for rows in result.partitions():
+            # Checking existence is blocking file I/O - one directory listing per
+            # album directory instead of one stat() per track, off the event loop
+            missing_paths = await asyncio.to_thread(
+                self._find_missing_files, [row.file_path for row in rows if row.file_path]
+            )
+            for row in rows:
+                if row.file_path and row.file_path in missing_paths:
+                    logger.info("Missing track file: %s", row.file_path)
+                    missing_tracks.append(row)
+                else:
+                    stats["verified"] += 1
+        
+        stats["missing_tracks"] = len(missing_tracks)
+        albums_to_check = {row.album_id for row in missing_tracks if row.album_id}
+        
+        missing_ids = [row.id for row in missing_tracks]
+        for i in range(0, len(missing_ids), VERIFY_CHUNK_SIZE):
+            await self.db.execute(
+                update(Track)
+                .where(Track.id.in_(missing_ids[i:i + VERIFY_CHUNK_SIZE]))
+                .values(is_downloaded=False, file_path=None)
+            )
         
         # Check albums - if all tracks are missing, DELETE the album entirely
         # This prevents stale records from appearing in search results
-        for album_id in albums_to_check:
+        album_ids = list(albums_to_check)
+        for i in range(0, len(album_ids), ALBUM_CHECK_CHUNK_SIZE):
+            # One statement per chunk: find the albums among these with no
+            # downloaded track left, delete their tracks, then the albums.
+            # (Foreign keys are checked at the end of the whole statement.)
+            empty_albums = (
+                select(Track.album_id)
+                .where(Track.album_id.in_(album_ids[i:i + ALBUM_CHECK_CHUNK_SIZE]))
+                .group_by(Track.album_id)
+                .having(func.bool_or(Track.is_downloaded).is_not(True))
+                .cte("empty_albums")
+            )
+            deleted_tracks = (
+                delete(Track)
+                .where(Track.album_id.in_(select(empty_albums.c.album_id)))
+                .cte("deleted_tracks")
+            )
+            # None of these rows are loaded in the session, so there's nothing
+            # to synchronize (the ORM's sync step would also drop the RETURNING)
             result = await self.db.execute(
-                select(Album).where(Album.id == album_id).options(selectinload(Album.tracks))
+                delete(Album)
+                .where(Album.id.in_(select(empty_albums.c.album_id)))
+                .returning(Album.title)
+                .add_cte(deleted_tracks),
+                execution_options={"synchronize_session": False}
             )
-            album = result.scalar_one_or_none()
-            if album:
-                # Check if any tracks are still downloaded
-                has_downloaded_tracks = any(t.is_downloaded for t in album.tracks)
-                if not has_downloaded_tracks:
-                    print(f"Album has no local files, deleting from database: {album.title}")
-                    # Delete all tracks for this album first
-                    for track in album.tracks:
-                        await self.db.delete(track)
-                    # Delete the album
-                    await self.db.delete(album)
-                    stats["missing_albums"] += 1
-        
-        # Clean up orphaned artists (artists with no albums)
-        from sqlalchemy import func
-        orphan_result = await self.db.execute(
-            select(Artist).where(
-                ~Artist.id.in_(select(Album.artist_id).distinct())
+            for title in result.scalars():
+                logger.info("Album has no local files, deleting from database: %s", title)
+                stats["missing_albums"] += 1
+        
+        # Clean up orphaned artists (artists with no albums) in one statement.
+        # Artists still credited on a track are kept - the foreign key forbids it
+        result = await self.db.execute(
+            delete(Artist)
+            .where(
+                ~select(Album.id).where(Album.artist_id == Artist.id).exists(),
+                ~select(Track.id).where(Track.artist_id == Artist.id).exists()
             )
+            .returning(Artist.name)
         )
-        orphaned_artists = orphan_result.scalars().all()
-        for artist in orphaned_artists:
-            print(f"Deleting orphaned artist: {artist.name}")
-            await self.db.delete(artist)
+        for name in result.scalars():
+            logger.info("Deleting orphaned artist: %s", name)
         
         await self.db.commit()
-        print(f"File verification complete: {stats}")
+        logger.info("File verification complete: %s", stats)
         return stats
     
+    async def backfill_normalized_names(self) -> int:
+        """
+        Populate normalized title/name columns for rows created before they existed.
+        New and updated rows are normalized by the model validators.
+        """
+        updated = 0
+        for model, source, target in (
+            (Artist, Artist.name, Artist.name_normalized),
+            (Album, Album.title, Album.title_normalized),
+            (Track, Track.title, Track.title_normalized),
+        ):
+            result = await self.db.execute(
+                select(model.id, source).where(target.is_(None))
+            )
+            rows = [
+                {"id": row_id, target.key: normalize_title(value)}
+                for row_id, value in result.all()
+            ]
+            if rows:
+                await self.db.execute(update(model), rows)
+                updated += len(rows)
+        
+        await self.db.commit()
+        return updated
+    
     async def check_track_availability(self, track_id: int) -> dict:
         """
         Check if a specific track is available locally.
         Returns availability status and whether re-download is needed.
         """
         result = await self.db.execute(
-            select(Track).where(Track.id == track_id).options(selectinload(Track.album))
+            select(Track.is_downloaded, Track.file_path, Album.qobuz_url)
+            .outerjoin(Album, Album.id == Track.album_id)
+            .where(Track.id == track_id)
         )
-        track = result.scalar_one_or_none()
+        track = result.first()
         
         if not track:
             return {"available": False, "needs_download": True, "reason": "Track not in database"}
@@ -616,20 +1228,24 @@ class MusicService:
                 "available": False, 
                 "needs_download": True, 
                 "reason": "Track not downloaded",
-                "qobuz_url": track.album.qobuz_url if track.album else None
+                "qobuz_url": track.qobuz_url
             }
         
-        if track.file_path and os.path.exists(track.file_path):
+        if track.file_path and await asyncio.to_thread(os.path.exists, track.file_path):
             return {"available": True, "needs_download": False}
         
         # File is missing - update database and return needs_download
-        track.is_downloaded = False
-        track.file_path = None
+        # (unless a rescan has pointed the track at a new file meanwhile)
+        await self.db.execute(
+            update(Track)
+            .where(Track.id == track_id, Track.file_path.is_not_distinct_from(track.file_path))
+            .values(is_downloaded=False, file_path=None)
+        )
         await self.db.commit()
         
         return {
             "available": False,
             "needs_download": True,
             "reason": "Local file missing",
-            "qobuz_url": track.album.qobuz_url if track.album else None
+            "qobuz_url": track.qobuz_url
         }
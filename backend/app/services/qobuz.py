@@ -1,8 +1,144 @@
+import asyncio
 import hashlib
-import time
-from typing import Dict, List, Optional, Any
+import logging
+import re
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
+from urllib.parse import urlencode
 import httpx
+import orjson
+from cachetools import TTLCache
+from app.models.music import normalize_title
 from app.schemas.music import AlbumResponse, TrackResponse, ArtistResponse
+from app.services.cache import cache_get, cache_set
+
+logger = logging.getLogger("auvia.qobuz")
+
+# One long-lived client for all Qobuz calls, so requests reuse pooled
+# keep-alive connections instead of a new TCP+TLS handshake each time.
+# HTTP/2 (negotiated, with HTTP/1.1 fallback) multiplexes the concurrent
+# search/featured requests over a single connection
+QOBUZ_TIMEOUT = 10.0  # seconds
+QOBUZ_MAX_CONNECTIONS = 100
+QOBUZ_MAX_KEEPALIVE_CONNECTIONS = 20
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Raw API responses are cached under qobuz:* (see QobuzService._get_json)
+QOBUZ_SEARCH_CACHE_TTL = 300  # 5 minutes
+QOBUZ_TRENDING_CACHE_TTL = 3600  # 1 hour
+QOBUZ_ALBUM_CACHE_TTL = 3600  # 1 hour
+QOBUZ_ARTIST_IMAGE_CACHE_TTL = 24 * 3600  # 1 day
+# Last good responses outlive the fresh ones, to fall back on when Qobuz fails
+QOBUZ_STALE_TTL_FACTOR = 24
+
+# Resolved artist image URLs by normalized artist name. Album grids ask for the
+# same artists over and over, so repeats skip even the response cache and parsing
+ARTIST_IMAGE_CACHE_MAXSIZE = 4096
+_artist_image_cache: TTLCache = TTLCache(maxsize=ARTIST_IMAGE_CACHE_MAXSIZE, ttl=QOBUZ_ARTIST_IMAGE_CACHE_TTL)
+# Featured-artist credits after the main artist ("X feat. Y", "X ft Y", "X featuring Y")
+_FEATURING_RE = re.compile(r'\s+(?:feat\.?|ft\.?|featuring)\s+.*$', re.IGNORECASE)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared Qobuz HTTP client"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=QOBUZ_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=QOBUZ_MAX_CONNECTIONS,
+                max_keepalive_connections=QOBUZ_MAX_KEEPALIVE_CONNECTIONS
+            )
+        )
+    return _http_client
+
+
+async def warm_http_client() -> None:
+    """
+    Open a keep-alive connection to Qobuz ahead of the first user request, so
+    the first search after startup doesn't pay for DNS + TCP + TLS
+    """
+    try:
+        await get_http_client().head(QobuzService.BASE_URL)
+    except Exception as e:
+        logger.warning("Qobuz connection warm-up failed: %s", e)
+
+
+async def close_http_client() -> None:
+    """Close the shared Qobuz HTTP client and its pooled connections"""
+    global _http_client
+    if _http_client is not None:
+        try:
+            await _http_client.aclose()
+        except Exception as e:
+            logger.warning("Qobuz HTTP client close error: %s", e)
+        _http_client = None
+
+
+# "M:SS" for every duration under an hour, indexed by seconds - nearly all tracks
+_MMSS_LIMIT = 3600
+_MMSS = tuple(f"{m}:{s:02d}" for m in range(_MMSS_LIMIT // 60) for s in range(60))
+
+
+def _primary_artist(name: str) -> str:
+    """Artist name without featured-artist credits"""
+    return _FEATURING_RE.sub('', name.strip())
+
+
+def _artist_key(name: str) -> str:
+    """
+    Canonical form of an artist name, so spelling variants of one artist
+    ("The Beatles", "Beatles, The", "the beatles feat. X") compare equal
+    """
+    key = normalize_title(_primary_artist(name))
+    if key.startswith("the "):
+        key = key[4:]
+    elif key.endswith(" the"):
+        # "Beatles, The" - the comma is gone after normalize_title
+        key = key[:-4]
+    # Names made only of punctuation ("!!!") normalize to nothing
+    return key or name.strip().lower()
+
+
+def _cover_url(image: Any) -> Optional[str]:
+    """Largest cover art URL of an API image object"""
+    if not isinstance(image, dict):
+        return None
+    get = image.get
+    return get("large") or get("small") or get("thumbnail")
+
+
+def _artist_name(artist: Any) -> str:
+    """Artist name from a nested artist object or a bare value"""
+    if isinstance(artist, dict):
+        return artist.get("name") or "Unknown Artist"
+    return str(artist) if artist else "Unknown Artist"
+
+
+def _album_url(slug: Optional[str], qobuz_id: str) -> str:
+    """Qobuz web URL of an album"""
+    return f"https://www.qobuz.com/us-en/album/{slug}/{qobuz_id}"
+
+
+def _release_date(released_at: Any) -> Optional[str]:
+    """YYYY-MM-DD from a released_at date string or Unix timestamp"""
+    if isinstance(released_at, str):
+        return released_at[:10] if len(released_at) >= 10 else None
+    if isinstance(released_at, (int, float)):
+        try:
+            return datetime.fromtimestamp(released_at).strftime("%Y-%m-%d")
+        except (ValueError, OverflowError, OSError):
+            return None
+    return None
+
+
+def _dict_items(items: Any) -> List[Dict]:
+    """The dict entries of an API item list, dropping anything malformed"""
+    if not isinstance(items, list):
+        return []
+    return [item for item in items if isinstance(item, dict)]
 
 
 class QobuzService:
@@ -47,19 +183,14 @@ class QobuzService:
                         secrets = config.secrets
                     if config.password_or_token:
                         user_auth_token = config.password_or_token
-                    print(f"Loaded Qobuz config: app_id={app_id}, has_token={bool(user_auth_token)}")
+                    logger.debug("Loaded Qobuz config: app_id=%s, has_token=%s", app_id, bool(user_auth_token))
         except Exception as e:
-            print(f"Error loading Qobuz config from DB: {e}")
+            logger.error("Error loading Qobuz config from DB: %s", e)
         
         service = cls(app_id=app_id, secrets=secrets)
         service.user_auth_token = user_auth_token
         return service
         
-    def _get_request_sig(self, method: str, timestamp: int) -> str:
-        """Generate request signature for API calls"""
-        sig_string = f"{method}{timestamp}{self.secrets[0]}"
-        return hashlib.md5(sig_string.encode()).hexdigest()
-    
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers including auth token if available"""
         headers = {}
@@ -67,10 +198,59 @@ class QobuzService:
             headers["X-User-Auth-Token"] = self.user_auth_token
         return headers
     
-    async def search(self, query: str, limit: int = 20) -> Dict[str, List]:
+    async def _get(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET an API path with the shared client; auth headers are per request"""
+        return await get_http_client().get(
+            f"{self.BASE_URL}{path}",
+            params=params,
+            headers=self._get_headers()
+        )
+    
+    async def _get_json(self, path: str, params: Dict[str, Any], ttl: int, refresh: bool = False) -> Optional[Dict]:
+        """
+        GET an API path and return its JSON body, cached for ttl seconds.
+        refresh=True skips the cached copy and always asks Qobuz.
+        If Qobuz errors or is unreachable, the last good response is served
+        instead (kept QOBUZ_STALE_TTL_FACTOR times longer). Returns None on a
+        failed request with nothing cached.
+        """
+        digest = hashlib.blake2b(
+            f"{path}?{urlencode(sorted(params.items()))}".encode(),
+            digest_size=16
+        ).hexdigest()
+        key = f"qobuz:{digest}"
+        stale_key = f"qobuz:stale:{digest}"
+        
+        if not refresh:
+            data = await cache_get(key)
+            if data is not None:
+                return data
+        
+        try:
+            response = await self._get(path, params)
+        except httpx.HTTPError as e:
+            data = await cache_get(stale_key)
+            if data is None:
+                raise
+            logger.warning("Qobuz %s error, serving cached response: %s", path, e)
+            return data
+        
+        if response.status_code != 200:
+            logger.warning("Qobuz %s failed: %s %s", path, response.status_code, response.text[:200])
+            return await cache_get(stale_key)
+        
+        # orjson parses the body bytes directly, several times faster than json
+        data = orjson.loads(response.content)
+        await cache_set(key, data, ttl)
+        # Only read when Qobuz fails - keep it out of the in-process cache
+        await cache_set(stale_key, data, ttl * QOBUZ_STALE_TTL_FACTOR, l1=False)
+        return data
+    
+    async def search(self, query: str, limit: int = 20, refresh: bool = False) -> Dict[str, List]:
         """
         Search for albums, tracks, and artists.
         Returns combined results from all categories.
+        refresh=True bypasses cached API responses.
         """
         results = {
             "albums": [],
@@ -79,158 +259,149 @@ class QobuzService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=10.0, headers=self._get_headers()) as client:
-                timestamp = int(time.time())
-                
-                params = {
-                    "query": query,
-                    "limit": limit,
-                    "app_id": self.app_id
-                }
-                
-                # Search albums
-                album_response = await client.get(
-                    f"{self.BASE_URL}/album/search",
-                    params=params
-                )
-                print(f"Qobuz album search status: {album_response.status_code}")
-                if album_response.status_code == 200:
-                    data = album_response.json()
-                    items = data.get("albums", {}).get("items", [])
-                    print(f"Qobuz found {len(items)} albums")
-                    results["albums"] = self._parse_albums(items)
-                else:
-                    print(f"Qobuz album search failed: {album_response.text[:200]}")
-                
-                # Search tracks
-                track_response = await client.get(
-                    f"{self.BASE_URL}/track/search",
-                    params=params
-                )
-                if track_response.status_code == 200:
-                    data = track_response.json()
-                    results["tracks"] = self._parse_tracks(data.get("tracks", {}).get("items", []))
-                
-                # Search artists
-                artist_response = await client.get(
-                    f"{self.BASE_URL}/artist/search",
-                    params=params
-                )
-                if artist_response.status_code == 200:
-                    data = artist_response.json()
-                    results["artists"] = self._parse_artists(data.get("artists", {}).get("items", []))
-                    
+            async for category, items in self.search_stream(query, limit, refresh):
+                results[category] = items
         except Exception as e:
-            print(f"Qobuz search error: {e}")
+            logger.error("Qobuz search error: %s", e)
             # Return empty results on error
         
         return results
     
+    async def search_stream(self, query: str, limit: int = 20, refresh: bool = False) -> AsyncIterator[Tuple[str, List]]:
+        """
+        Search albums, tracks and artists concurrently, yielding
+        (category, results) for each category as soon as its request finishes.
+        A failed category yields an empty list. refresh=True bypasses cached API responses.
+        """
+        params = {
+            "query": query,
+            "limit": limit,
+            "app_id": self.app_id
+        }
+        searches = (
+            ("albums", "/album/search", self._parse_albums),
+            ("tracks", "/track/search", self._parse_tracks),
+            ("artists", "/artist/search", self._parse_artists),
+        )
+        
+        async def run(category: str, path: str, parse) -> Tuple[str, List]:
+            try:
+                data = await self._get_json(path, params, QOBUZ_SEARCH_CACHE_TTL, refresh)
+            except Exception as e:
+                logger.error("Qobuz %s search error: %s", category, e)
+                return category, []
+            if data is None:
+                return category, []
+            return category, parse(data.get(category, {}).get("items", []))
+        
+        tasks = [asyncio.create_task(run(*search)) for search in searches]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The consumer stopped early (e.g. the client went away)
+            for task in tasks:
+                task.cancel()
+    
     async def search_albums(self, query: str, limit: int = 20) -> List[AlbumResponse]:
         """Search specifically for albums"""
         try:
-            async with httpx.AsyncClient(timeout=10.0, headers=self._get_headers()) as client:
-                params = {
-                    "query": query,
-                    "limit": limit,
-                    "app_id": self.app_id
-                }
-                
-                response = await client.get(
-                    f"{self.BASE_URL}/album/search",
-                    params=params
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._parse_albums(data.get("albums", {}).get("items", []))
+            params = {
+                "query": query,
+                "limit": limit,
+                "app_id": self.app_id
+            }
+            
+            data = await self._get_json("/album/search", params, QOBUZ_SEARCH_CACHE_TTL)
+            if data is not None:
+                return self._parse_albums(data.get("albums", {}).get("items", []))
         except Exception as e:
-            print(f"Qobuz album search error: {e}")
+            logger.error("Qobuz album search error: %s", e)
         
         return []
     
     async def search_tracks(self, query: str, limit: int = 20) -> List[TrackResponse]:
         """Search specifically for tracks"""
         try:
-            async with httpx.AsyncClient(timeout=10.0, headers=self._get_headers()) as client:
-                params = {
-                    "query": query,
-                    "limit": limit,
-                    "app_id": self.app_id
-                }
-                
-                response = await client.get(
-                    f"{self.BASE_URL}/track/search",
-                    params=params
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._parse_tracks(data.get("tracks", {}).get("items", []))
+            params = {
+                "query": query,
+                "limit": limit,
+                "app_id": self.app_id
+            }
+            
+            data = await self._get_json("/track/search", params, QOBUZ_SEARCH_CACHE_TTL)
+            if data is not None:
+                return self._parse_tracks(data.get("tracks", {}).get("items", []))
         except Exception as e:
-            print(f"Qobuz track search error: {e}")
+            logger.error("Qobuz track search error: %s", e)
         
         return []
     
-    async def search_artists(self, query: str, limit: int = 20) -> List[ArtistResponse]:
+    async def search_artists(
+        self,
+        query: str,
+        limit: int = 20,
+        cache_ttl: int = QOBUZ_SEARCH_CACHE_TTL
+    ) -> List[ArtistResponse]:
         """Search specifically for artists"""
         try:
-            async with httpx.AsyncClient(timeout=10.0, headers=self._get_headers()) as client:
-                params = {
-                    "query": query,
-                    "limit": limit,
-                    "app_id": self.app_id
-                }
-                
-                response = await client.get(
-                    f"{self.BASE_URL}/artist/search",
-                    params=params
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._parse_artists(data.get("artists", {}).get("items", []))
+            params = {
+                "query": query,
+                "limit": limit,
+                "app_id": self.app_id
+            }
+            
+            data = await self._get_json("/artist/search", params, cache_ttl)
+            if data is not None:
+                return self._parse_artists(data.get("artists", {}).get("items", []))
         except Exception as e:
-            print(f"Qobuz artist search error: {e}")
+            logger.error("Qobuz artist search error: %s", e)
         
         return []
     
     async def get_artist_image(self, artist_name: str) -> Optional[str]:
         """Get artist image URL by searching for the artist name"""
+        cache_key = _artist_key(artist_name)
+        image_url = _artist_image_cache.get(cache_key)
+        if image_url:
+            return image_url
+        
         try:
-            artists = await self.search_artists(artist_name, limit=5)
+            # Artist images hardly ever change - cache the lookup for a day.
+            # Featured artists would only muddy the search
+            artists = await self.search_artists(
+                _primary_artist(artist_name),
+                limit=5,
+                cache_ttl=QOBUZ_ARTIST_IMAGE_CACHE_TTL
+            )
             if artists:
-                # Find best match (exact name match preferred)
+                # Find best match (same canonical name preferred)
                 for artist in artists:
-                    if artist.name.lower() == artist_name.lower() and artist.image_url:
+                    if _artist_key(artist.name) == cache_key and artist.image_url:
+                        _artist_image_cache[cache_key] = artist.image_url
                         return artist.image_url
                 # Fallback to first result with image
                 for artist in artists:
                     if artist.image_url:
+                        _artist_image_cache[cache_key] = artist.image_url
                         return artist.image_url
         except Exception as e:
-            print(f"Error getting artist image for {artist_name}: {e}")
+            logger.warning("Error getting artist image for %s: %s", artist_name, e)
         return None
     
     async def get_album(self, album_id: str) -> Optional[AlbumResponse]:
         """Get album details including tracks"""
         try:
-            async with httpx.AsyncClient(timeout=10.0, headers=self._get_headers()) as client:
-                params = {
-                    "album_id": album_id,
-                    "app_id": self.app_id
-                }
-                
-                response = await client.get(
-                    f"{self.BASE_URL}/album/get",
-                    params=params
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return self._parse_album_detail(data)
+            params = {
+                "album_id": album_id,
+                "app_id": self.app_id
+            }
+            
+            data = await self._get_json("/album/get", params, QOBUZ_ALBUM_CACHE_TTL)
+            if data is not None:
+                return self._parse_album_detail(data)
         except Exception as e:
-            print(f"Qobuz get album error: {e}")
+            logger.error("Qobuz get album error: %s", e)
         
         return None
     
@@ -243,137 +414,84 @@ class QobuzService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=10.0, headers=self._get_headers()) as client:
-                # Get new releases
-                new_params = {
-                    "type": "new-releases",
-                    "limit": 20,
-                    "app_id": self.app_id
-                }
-                
-                new_response = await client.get(
-                    f"{self.BASE_URL}/album/getFeatured",
-                    params=new_params
+            # New releases, press awards/trending and editor picks/featured,
+            # fetched concurrently
+            new_data, trending_data, featured_data = await asyncio.gather(*(
+                self._get_json(
+                    "/album/getFeatured",
+                    {
+                        "type": featured_type,
+                        "limit": 20,
+                        "app_id": self.app_id
+                    },
+                    QOBUZ_TRENDING_CACHE_TTL
                 )
-                
-                print(f"Qobuz new releases status: {new_response.status_code}, app_id: {self.app_id}")
-                if new_response.status_code == 200:
-                    data = new_response.json()
-                    items = data.get("albums", {}).get("items", [])
-                    print(f"Qobuz found {len(items)} new releases")
-                    results["new_releases"] = self._parse_albums(items)
-                else:
-                    print(f"Qobuz new releases failed: {new_response.text[:300]}")
-                
-                # Get press awards/trending
-                trending_params = {
-                    "type": "press-awards",
-                    "limit": 20,
-                    "app_id": self.app_id
-                }
-                
-                trending_response = await client.get(
-                    f"{self.BASE_URL}/album/getFeatured",
-                    params=trending_params
+                for featured_type in ("new-releases", "press-awards", "editor-picks")
+            ), return_exceptions=True)
+            
+            # New releases
+            if isinstance(new_data, Exception):
+                logger.error("Qobuz new releases error: %s", new_data)
+            elif new_data is not None:
+                items = new_data.get("albums", {}).get("items", [])
+                logger.debug("Qobuz found %s new releases, app_id: %s", len(items), self.app_id)
+                results["new_releases"] = self._parse_albums(items)
+            
+            # Press awards/trending
+            if isinstance(trending_data, Exception):
+                logger.error("Qobuz press awards error: %s", trending_data)
+            elif trending_data is not None:
+                results["trending"] = self._parse_albums(
+                    trending_data.get("albums", {}).get("items", [])
                 )
-                
-                if trending_response.status_code == 200:
-                    data = trending_response.json()
-                    results["trending"] = self._parse_albums(
-                        data.get("albums", {}).get("items", [])
-                    )
-                
-                # Get editor picks/featured
-                featured_params = {
-                    "type": "editor-picks",
-                    "limit": 20,
-                    "app_id": self.app_id
-                }
-                
-                featured_response = await client.get(
-                    f"{self.BASE_URL}/album/getFeatured",
-                    params=featured_params
+            
+            # Editor picks/featured
+            if isinstance(featured_data, Exception):
+                logger.error("Qobuz editor picks error: %s", featured_data)
+            elif featured_data is not None:
+                results["featured"] = self._parse_albums(
+                    featured_data.get("albums", {}).get("items", [])
                 )
                 
-                if featured_response.status_code == 200:
-                    data = featured_response.json()
-                    results["featured"] = self._parse_albums(
-                        data.get("albums", {}).get("items", [])
-                    )
-                    
         except Exception as e:
-            print(f"Qobuz trending error: {e}")
+            logger.error("Qobuz trending error: %s", e)
         
         return results
     
     def _parse_albums(self, items: List[Dict]) -> List[AlbumResponse]:
         """Parse album items from API response"""
         albums = []
-        for item in items:
+        # Skip anything that is not a dict (sometimes API returns weird data)
+        for item in _dict_items(items):
             try:
-                # Skip if item is not a dict (sometimes API returns weird data)
-                if not isinstance(item, dict):
-                    continue
-                
-                # Handle artist - can be nested object or direct
-                artist_data = item.get("artist", {})
-                if isinstance(artist_data, dict):
-                    artist_name = artist_data.get("name", "Unknown Artist")
-                else:
-                    artist_name = str(artist_data) if artist_data else "Unknown Artist"
-                
-                qobuz_id = str(item.get("id", ""))
-                
-                # Build Qobuz URL
-                slug = item.get("slug", "")
-                qobuz_url = f"https://www.qobuz.com/us-en/album/{slug}/{qobuz_id}" if slug else None
-                
-                # Get cover art - prefer largest available
-                image = item.get("image", {})
-                if isinstance(image, dict):
-                    cover_art_url = (
-                        image.get("large") or 
-                        image.get("small") or 
-                        image.get("thumbnail")
-                    )
-                else:
-                    cover_art_url = None
+                get = item.get
+                qobuz_id = str(get("id", ""))
+                slug = get("slug", "")
                 
                 # Handle genre - can be nested or direct
-                genre_data = item.get("genre", {})
+                genre_data = get("genre", {})
                 if isinstance(genre_data, dict):
                     genre = genre_data.get("name")
                 else:
                     genre = str(genre_data) if genre_data else None
                 
-                # Handle released_at - can be string or timestamp
-                released_at = item.get("released_at")
-                if isinstance(released_at, str) and len(released_at) >= 10:
-                    release_date = released_at[:10]
-                elif isinstance(released_at, (int, float)):
-                    from datetime import datetime
-                    release_date = datetime.fromtimestamp(released_at).strftime("%Y-%m-%d")
-                else:
-                    release_date = None
-                
-                # Debug: print cover URL for first few albums
-                if len(albums) < 3:
-                    print(f"Album: {item.get('title')} - Cover URL: {cover_art_url}")
-                
-                albums.append(AlbumResponse(
-                    title=item.get("title", "Unknown Album"),
-                    artist_name=artist_name,
+                # Fields are already extracted defensively - skip validation
+                albums.append(AlbumResponse.model_construct(
+                    title=get("title") or "Unknown Album",
+                    artist_name=_artist_name(get("artist", {})),
                     qobuz_id=qobuz_id,
-                    qobuz_url=qobuz_url,
-                    cover_art_url=cover_art_url,
-                    release_date=release_date,
+                    qobuz_url=_album_url(slug, qobuz_id) if slug else None,
+                    # Prefer the largest available cover art
+                    cover_art_url=_cover_url(get("image")),
+                    release_date=_release_date(get("released_at")),
                     genre=genre,
-                    total_tracks=item.get("tracks_count"),
-                    duration=item.get("duration"),
+                    total_tracks=get("tracks_count"),
+                    duration=get("duration"),
                     is_downloaded=False
                 ))
             except Exception as e:
-                print(f"Error parsing album: {e} - Item: {item}")
+                # Skip just this item
+                logger.warning("Error parsing album: %s - Item: %s", e, item)
                 continue
         
         return albums
@@ -381,70 +499,47 @@ class QobuzService:
     def _parse_tracks(self, items: List[Dict]) -> List[TrackResponse]:
         """Parse track items from API response"""
         tracks = []
-        for item in items:
+        for item in _dict_items(items):
             try:
-                if not isinstance(item, dict):
-                    continue
-                
-                # Handle performer/artist
-                performer = item.get("performer", {})
-                if isinstance(performer, dict):
-                    artist_name = performer.get("name", "")
-                else:
-                    artist_name = ""
+                get = item.get
                 
-                # Fallback to album artist
-                if not artist_name:
-                    album = item.get("album", {})
-                    if isinstance(album, dict):
-                        album_artist = album.get("artist", {})
-                        if isinstance(album_artist, dict):
-                            artist_name = album_artist.get("name", "Unknown Artist")
-                        else:
-                            artist_name = "Unknown Artist"
-                    else:
-                        artist_name = "Unknown Artist"
+                # Handle performer/artist, falling back to the album artist
+                performer = get("performer")
+                artist_name = performer.get("name") if isinstance(performer, dict) else None
                 
-                album = item.get("album", {})
+                album = get("album")
                 album_title = None
                 cover_art_url = None
                 qobuz_album_id = None
                 qobuz_album_url = None
                 
                 if isinstance(album, dict):
+                    if not artist_name:
+                        artist_name = _artist_name(album.get("artist"))
                     album_title = album.get("title")
                     qobuz_album_id = str(album.get("id", "")) if album.get("id") else None
-                    album_slug = album.get("slug", "")
                     if qobuz_album_id:
                         # Use slug if available, otherwise use placeholder
-                        if album_slug:
-                            qobuz_album_url = f"https://www.qobuz.com/us-en/album/{album_slug}/{qobuz_album_id}"
-                        else:
-                            qobuz_album_url = f"https://www.qobuz.com/us-en/album/-/{qobuz_album_id}"
-                    
-                    album_image = album.get("image", {})
-                    if isinstance(album_image, dict):
-                        cover_art_url = (
-                            album_image.get("large") or 
-                            album_image.get("small") or 
-                            album_image.get("thumbnail")
-                        )
+                        qobuz_album_url = _album_url(album.get("slug") or "-", qobuz_album_id)
+                    cover_art_url = _cover_url(album.get("image"))
                 
-                tracks.append(TrackResponse(
-                    title=item.get("title", "Unknown Track"),
-                    artist_name=artist_name,
+                # Fields are already extracted defensively - skip validation
+                tracks.append(TrackResponse.model_construct(
+                    title=get("title") or "Unknown Track",
+                    artist_name=artist_name or "Unknown Artist",
                     album_title=album_title,
-                    qobuz_id=str(item.get("id", "")),
+                    qobuz_id=str(get("id", "")),
                     qobuz_album_id=qobuz_album_id,
                     qobuz_album_url=qobuz_album_url,
-                    track_number=item.get("track_number"),
-                    duration=item.get("duration"),
-                    duration_formatted=self._format_duration(item.get("duration")),
+                    track_number=get("track_number"),
+                    duration=get("duration"),
+                    duration_formatted=self._format_duration(get("duration")),
                     is_downloaded=False,
                     cover_art_url=cover_art_url
                 ))
             except Exception as e:
-                print(f"Error parsing track: {e} - Item: {item}")
+                # Skip just this item
+                logger.warning("Error parsing track: %s - Item: %s", e, item)
                 continue
         
         return tracks
@@ -452,12 +547,11 @@ class QobuzService:
     def _parse_artists(self, items: List[Dict]) -> List[ArtistResponse]:
         """Parse artist items from API response"""
         artists = []
-        for item in items:
+        for item in _dict_items(items):
             try:
-                if not isinstance(item, dict):
-                    continue
+                get = item.get
                 
-                image = item.get("image", {})
+                image = get("image")
                 if isinstance(image, dict):
                     image_url = (
                         image.get("large") or 
@@ -467,46 +561,29 @@ class QobuzService:
                 else:
                     image_url = None
                 
-                bio_data = item.get("biography", {})
-                if isinstance(bio_data, dict):
-                    bio = bio_data.get("content")
-                else:
-                    bio = None
+                bio_data = get("biography")
+                bio = bio_data.get("content") if isinstance(bio_data, dict) else None
                 
-                artists.append(ArtistResponse(
-                    name=item.get("name", "Unknown Artist"),
-                    qobuz_id=str(item.get("id", "")),
+                # Fields are already extracted defensively - skip validation
+                artists.append(ArtistResponse.model_construct(
+                    name=get("name") or "Unknown Artist",
+                    qobuz_id=str(get("id", "")),
                     image_url=image_url,
                     bio=bio
                 ))
             except Exception as e:
-                print(f"Error parsing artist: {e} - Item: {item}")
+                # Skip just this item
+                logger.warning("Error parsing artist: %s - Item: %s", e, item)
                 continue
         
         return artists
     
     def _parse_album_detail(self, data: Dict) -> AlbumResponse:
         """Parse detailed album response including tracks"""
-        # Safely get artist name
-        artist_data = data.get("artist")
-        if isinstance(artist_data, dict):
-            artist_name = artist_data.get("name", "Unknown Artist")
-        else:
-            artist_name = "Unknown Artist"
-        
+        artist_name = _artist_name(data.get("artist"))
         qobuz_id = str(data.get("id", ""))
         slug = data.get("slug", "")
-        
-        # Safely get cover art
-        image = data.get("image")
-        if isinstance(image, dict):
-            cover_art_url = (
-                image.get("large") or 
-                image.get("small") or 
-                image.get("thumbnail")
-            )
-        else:
-            cover_art_url = None
+        cover_art_url = _cover_url(data.get("image"))
         
         # Safely get genre
         genre_data = data.get("genre")
@@ -517,13 +594,13 @@ class QobuzService:
         tracks_data = data.get("tracks")
         track_items = tracks_data.get("items", []) if isinstance(tracks_data, dict) else []
         
-        for item in track_items:
+        for item in _dict_items(track_items):
             # Safely get performer name
             performer = item.get("performer")
-            track_artist = performer.get("name", artist_name) if isinstance(performer, dict) else artist_name
+            track_artist = (performer.get("name") if isinstance(performer, dict) else None) or artist_name
             
-            tracks.append(TrackResponse(
-                title=item.get("title", "Unknown Track"),
+            tracks.append(TrackResponse.model_construct(
+                title=item.get("title") or "Unknown Track",
                 artist_name=track_artist,
                 album_title=data.get("title"),
                 qobuz_id=str(item.get("id", "")),
@@ -535,17 +612,13 @@ class QobuzService:
                 cover_art_url=cover_art_url
             ))
         
-        # Safely get release date
-        released_at = data.get("released_at")
-        release_date = released_at[:10] if isinstance(released_at, str) and released_at else None
-        
-        return AlbumResponse(
-            title=data.get("title", "Unknown Album"),
+        return AlbumResponse.model_construct(
+            title=data.get("title") or "Unknown Album",
             artist_name=artist_name,
             qobuz_id=qobuz_id,
-            qobuz_url=f"https://www.qobuz.com/us-en/album/{slug}/{qobuz_id}" if slug else None,
+            qobuz_url=_album_url(slug, qobuz_id) if slug else None,
             cover_art_url=cover_art_url,
-            release_date=release_date,
+            release_date=_release_date(data.get("released_at")),
             genre=genre,
             total_tracks=data.get("tracks_count"),
             duration=data.get("duration"),
@@ -556,16 +629,15 @@ class QobuzService:
     
     def _format_duration(self, seconds: Optional[int]) -> str:
         """Format duration in seconds to MM:SS or HH:MM:SS"""
-        if not seconds:
+        if not isinstance(seconds, (int, float)) or seconds <= 0:
             return "0:00"
+        seconds = int(seconds)
+        if seconds < _MMSS_LIMIT:
+            return _MMSS[seconds]
         
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
-        
-        if hours > 0:
-            return f"{hours}:{minutes:02d}:{secs:02d}"
-        return f"{minutes}:{secs:02d}"
+        minutes, secs = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}"
     
     @staticmethod
     def extract_album_id_from_url(url: str) -> Optional[str]:
@@ -1,8 +1,159 @@
 import asyncio
+import copy
+import json
+import logging
 import os
-import toml
-from typing import Tuple, Optional
+import sys
+import threading
+import tomllib
+from typing import Tuple, Optional, List
 from pathlib import Path
+import tomli_w
+from app.config import settings
+
+logger = logging.getLogger("auvia.streamrip")
+
+
+# Streamrip runs in long-lived worker processes (see app/rip_worker.py) so it is
+# imported once rather than per download. Each worker handles one job at a
+# time; idle ones are reused and a new one is started when all are busy.
+# _rip_slots bounds the jobs in flight, and with them the number of workers
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+_RIP_WORKER_ARGV = (sys.executable, "-m", "app.rip_worker")
+_rip_workers: set = set()
+_idle_rip_workers: List[asyncio.subprocess.Process] = []
+_rip_slots = asyncio.Semaphore(settings.streamrip_max_parallel)
+
+# Held while the shared config file is read-modify-written (in worker threads)
+_config_write_lock = threading.Lock()
+
+# Directories this process already created or found, so repeat downloads to the
+# same storage location skip the makedirs syscalls. Only long-lived paths go
+# here - direct downloads use a fresh temp directory each time
+_ensured_dirs: set = set()
+
+
+async def _acquire_rip_worker() -> asyncio.subprocess.Process:
+    """Take an idle streamrip worker, or start a new one"""
+    while _idle_rip_workers:
+        process = _idle_rip_workers.pop()
+        if process.returncode is None:
+            return process
+        _rip_workers.discard(process)
+    
+    process = await asyncio.create_subprocess_exec(
+        *_RIP_WORKER_ARGV,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        cwd=_BACKEND_DIR
+    )
+    _rip_workers.add(process)
+    return process
+
+
+def _discard_rip_worker(process: asyncio.subprocess.Process) -> None:
+    """Stop a worker that can't be reused"""
+    _rip_workers.discard(process)
+    if process.returncode is None:
+        process.kill()
+
+
+async def close_rip_workers() -> None:
+    """Stop all streamrip worker processes"""
+    _idle_rip_workers.clear()
+    for process in list(_rip_workers):
+        _discard_rip_worker(process)
+        await process.wait()
+
+
+def _ensure_dir(path: str) -> None:
+    """os.makedirs(path, exist_ok=True), once per directory per process"""
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
+
+
+def _deep_update(target: dict, patch: dict) -> None:
+    """Merge patch into target in place, recursing into tables present in both"""
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _deep_update(target[key], value)
+        else:
+            target[key] = value
+
+
+# Built once; _get_default_config() hands out copies
+_DEFAULT_CONFIG = {
+    "downloads": {
+        "folder": "/music",
+        "source_subdirectories": False,
+        "disc_subdirectories": True,
+        "concurrency": True,
+        "max_connections": 6,
+        "requests_per_minute": -1
+    },
+    "qobuz": {
+        "quality": 1,
+        "download_booklets": True,
+        "use_auth_token": True,
+        "email_or_userid": "",
+        "password_or_token": "",
+        "app_id": "950096963",
+        "secrets": ["979549437fcc4a3faad4867b5cd25dcb"]
+    },
+    "tidal": {
+        "quality": 3,
+        "download_videos": True
+    },
+    "deezer": {
+        "quality": 2,
+        "deezloader_warnings": True
+    },
+    "soundcloud": {
+        "quality": 0
+    },
+    "youtube": {
+        "quality": 0,
+        "download_videos": False
+    },
+    "filepaths": {
+        "add_singles_to_folder": False,
+        "folder_format": "{albumartist} - {title} ({year})",
+        "track_format": "{tracknumber}. {artist} - {title}"
+    },
+    "artwork": {
+        "embed": True,
+        "embed_size": "large",
+        "embed_max_width": -1,
+        "save_artwork": True,
+        "saved_max_width": -1
+    },
+    "metadata": {
+        "set_playlist_to_album": True,
+        "exclude": []
+    },
+    "conversion": {
+        "enabled": False,
+        "codec": "MP3",
+        "sampling_rate": 48000,
+        "bit_depth": 24,
+        "lossy_bitrate": 320
+    },
+    "misc": {
+        "version": "2.0"
+    },
+    "cli": {
+        "text_output": True,
+        "progress_bars": False,
+        "max_search_results": 100
+    },
+    "database": {
+        "downloads_enabled": True,
+        "downloads_path": "/root/.config/streamrip/downloads.db",
+        "failed_downloads_enabled": True,
+        "failed_downloads_path": "/root/.config/streamrip/failed_downloads.db"
+    }
+}
 
 
 class StreamripService:
@@ -10,254 +161,252 @@ class StreamripService:
     
     CONFIG_PATH = Path.home() / ".config" / "streamrip" / "config.toml"
     
+    # Parsed config file as (st_mtime_ns, config), shared by all instances.
+    # Reparsed only when the file changes on disk
+    _config_cache: Optional[Tuple[int, dict]] = None
+    
     def __init__(self):
         self.config_path = self.CONFIG_PATH
     
+    def _load_config_cached(self) -> dict:
+        """
+        Parse the config file, reusing the last parse while its mtime is unchanged.
+        Returns a copy the caller may mutate. Raises FileNotFoundError if missing.
+        """
+        mtime_ns = os.stat(self.config_path).st_mtime_ns
+        cached = StreamripService._config_cache
+        if cached is None or cached[0] != mtime_ns:
+            cached = (mtime_ns, tomllib.loads(self.config_path.read_text(encoding="utf-8")))
+            StreamripService._config_cache = cached
+        return copy.deepcopy(cached[1])
+    
     async def download(self, url: str, output_path: str) -> Tuple[bool, Optional[str]]:
         """
         Download an album from Qobuz using streamrip.
         Returns (success, output_directory)
         """
+        success, new_dirs = await self.download_batch([url], output_path)
+        if not success:
+            return False, None
+        
+        new_album_dir = new_dirs[0] if new_dirs else None
+        if new_album_dir:
+            logger.info("Found new album directory: %s", new_album_dir)
+        else:
+            # If no new directory, try to find the most recently modified one
+            try:
+                latest_dir = None
+                latest_time = 0
+                for item in Path(output_path).iterdir():
+                    if item.is_dir():
+                        mtime = item.stat().st_mtime
+                        if mtime > latest_time:
+                            latest_time = mtime
+                            latest_dir = item
+                if latest_dir:
+                    new_album_dir = str(latest_dir)
+                    logger.info("Using most recent directory: %s", new_album_dir)
+            except Exception as e:
+                logger.warning("Error finding download directory: %s", e)
+        
+        return True, new_album_dir or output_path
+    
+    def album_dirs(self, output_path: str) -> List[str]:
+        """All album directories in output_path"""
+        try:
+            return [str(item) for item in Path(output_path).iterdir() if item.is_dir()]
+        except FileNotFoundError:
+            return []
+    
+    async def download_batch(self, urls: List[str], output_path: str) -> Tuple[bool, List[str]]:
+        """
+        Download several albums from Qobuz in a single streamrip run.
+        Returns (success, newly created album directories)
+        """
         try:
             # Ensure output directory exists
-            os.makedirs(output_path, exist_ok=True)
+            _ensure_dir(output_path)
             
             # Record directories before download to detect new ones
-            dirs_before = set()
-            for item in Path(output_path).iterdir():
-                if item.is_dir():
-                    dirs_before.add(item.name)
-            
-            # Update config with download path before downloading
-            await self._set_download_folder(output_path)
-            
-            # Build streamrip command with -ndb to skip internal database check
-            # This ensures re-downloads work even if streamrip thinks it already has the file
-            cmd = ["rip", "-ndb", "url", url]
-            
-            print(f"Executing: {' '.join(cmd)}")
-            
-            # Execute streamrip
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            stdout_text = stdout.decode() if stdout else ""
-            stderr_text = stderr.decode() if stderr else ""
-            
-            print(f"Streamrip stdout: {stdout_text}")
-            if stderr_text:
-                print(f"Streamrip stderr: {stderr_text}")
-            
-            if process.returncode == 0:
-                # Find newly created directories
-                new_album_dir = None
-                for item in Path(output_path).iterdir():
-                    if item.is_dir() and item.name not in dirs_before:
-                        new_album_dir = str(item)
-                        print(f"Found new album directory: {new_album_dir}")
-                        break
-                
-                # If no new directory, try to find the most recently modified one
-                if not new_album_dir:
-                    latest_dir = None
-                    latest_time = 0
-                    for item in Path(output_path).iterdir():
-                        if item.is_dir():
-                            mtime = item.stat().st_mtime
-                            if mtime > latest_time:
-                                latest_time = mtime
-                                latest_dir = item
-                    if latest_dir:
-                        new_album_dir = str(latest_dir)
-                        print(f"Using most recent directory: {new_album_dir}")
-                
-                return True, new_album_dir or output_path
-            else:
-                print(f"Streamrip error (code {process.returncode}): {stderr_text}")
-                return False, None
+            try:
+                entries = list(Path(output_path).iterdir())
+            except FileNotFoundError:
+                # Removed since this process created it
+                _ensured_dirs.discard(output_path)
+                _ensure_dir(output_path)
+                entries = []
+            dirs_before = {item.name for item in entries if item.is_dir()}
+            
+            logger.info("Downloading with streamrip: %s", urls)
+            
+            if not await self._rip(urls, output_path):
+                return False, []
+            
+            # Find newly created directories
+            new_dirs = [
+                str(item) for item in Path(output_path).iterdir()
+                if item.is_dir() and item.name not in dirs_before
+            ]
+            return True, new_dirs
                 
         except Exception as e:
-            print(f"Download error: {e}")
-            return False, None
+            logger.error("Download error: %s", e)
+            return False, []
     
-    async def _set_download_folder(self, folder: str) -> bool:
-        """Update the download folder in streamrip config"""
+    def _write_config(self, config: dict) -> None:
+        """
+        Write the shared config in one go, swapping it in so readers (and a crash
+        mid-write) never see a partial file
+        """
+        # Per-process temp name, so replicas sharing the config dir can't collide
+        tmp_path = self.config_path.with_suffix(f".toml.{os.getpid()}.tmp")
         try:
-            self.config_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(tomli_w.dumps(config).encode())
+            os.replace(tmp_path, self.config_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        StreamripService._config_cache = None
+    
+    def _ensure_config_file(self) -> None:
+        """Write the default config if none exists yet (e.g. before Qobuz is configured)"""
+        with _config_write_lock:
+            if not self.config_path.exists():
+                self.config_path.parent.mkdir(parents=True, exist_ok=True)
+                self._write_config(self._get_default_config())
+    
+    async def _run_job(self, job: dict) -> Tuple[bool, Optional[str]]:
+        """
+        Run one job on a streamrip worker process (see app/rip_worker.py).
+        Returns (success, error message)
+        """
+        await asyncio.to_thread(self._ensure_config_file)
+        job["config_path"] = str(self.config_path)
+        
+        async with _rip_slots:
+            process = await _acquire_rip_worker()
+            try:
+                process.stdin.write(json.dumps(job).encode() + b"\n")
+                await process.stdin.drain()
+                line = await process.stdout.readline()
+            except BaseException:
+                # Interrupted mid-job - the worker's state is unknown, don't reuse it
+                _discard_rip_worker(process)
+                raise
+            
+            if not line:
+                _discard_rip_worker(process)
+                return False, f"Streamrip worker exited unexpectedly (code {process.returncode})"
+            
+            _idle_rip_workers.append(process)
+        reply = json.loads(line)
+        return reply["ok"], reply["error"]
+    
+    async def _rip(self, urls: List[str], folder: str, quality: Optional[int] = None) -> bool:
+        """
+        Download urls into folder. The folder and quality apply to this run only,
+        the shared config file is left as is.
+        """
+        success, error = await self._run_job({
+            "action": "download",
+            "urls": urls,
+            "folder": folder,
+            "quality": quality
+        })
+        if not success:
+            logger.error("Streamrip error: %s", error)
+        return success
+    
+    async def apply_config_patch(self, patch: dict) -> bool:
+        """
+        Merge patch (tables may be nested) into the shared streamrip config
+        with one load and at most one write. Returns False if the config
+        already had those values and the file was left alone.
+        """
+        # File I/O and TOML parsing stay off the event loop
+        return await asyncio.to_thread(self._apply_config_patch, patch)
+    
+    def _apply_config_patch(self, patch: dict) -> bool:
+        # Serialize read-modify-write cycles from concurrent threads
+        with _config_write_lock:
+            # Ensure config directory exists
+            _ensure_dir(str(self.config_path.parent))
             
+            # Load existing config or create new one
+            original = None
             if self.config_path.exists():
-                config = toml.load(self.config_path)
+                config = self._load_config_cached()
+                original = copy.deepcopy(config)
             else:
                 config = self._get_default_config()
             
-            if "downloads" not in config:
-                config["downloads"] = {}
-            
-            config["downloads"]["folder"] = folder
+            _deep_update(config, patch)
             
-            with open(self.config_path, "w") as f:
-                toml.dump(config, f)
+            # Settings re-saved without changes - leave the file alone
+            if config == original:
+                return False
             
+            self._write_config(config)
             return True
-        except Exception as e:
-            print(f"Error setting download folder: {e}")
-            return False
     
     async def update_config(self, qobuz_config) -> bool:
         """Update streamrip configuration file with Qobuz credentials"""
         try:
-            # Ensure config directory exists
-            self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Load existing config or create new one
-            if self.config_path.exists():
-                config = toml.load(self.config_path)
-            else:
-                config = self._get_default_config()
-            
-            # Update Qobuz section
-            if "qobuz" not in config:
-                config["qobuz"] = {}
-            
-            config["qobuz"]["quality"] = qobuz_config.quality
-            config["qobuz"]["download_booklets"] = qobuz_config.download_booklets
-            config["qobuz"]["use_auth_token"] = qobuz_config.use_auth_token
+            qobuz = {
+                "quality": qobuz_config.quality,
+                "download_booklets": qobuz_config.download_booklets,
+                "use_auth_token": qobuz_config.use_auth_token
+            }
             
             if qobuz_config.email_or_userid:
-                config["qobuz"]["email_or_userid"] = qobuz_config.email_or_userid
+                qobuz["email_or_userid"] = qobuz_config.email_or_userid
             
             if qobuz_config.password_or_token:
-                config["qobuz"]["password_or_token"] = qobuz_config.password_or_token
+                qobuz["password_or_token"] = qobuz_config.password_or_token
             
             if qobuz_config.app_id:
-                config["qobuz"]["app_id"] = qobuz_config.app_id
+                qobuz["app_id"] = qobuz_config.app_id
             
             if qobuz_config.secrets:
-                config["qobuz"]["secrets"] = qobuz_config.secrets
+                qobuz["secrets"] = qobuz_config.secrets
             
-            # Ensure filepaths section has correct folder format (no [container] suffix)
-            if "filepaths" not in config:
-                config["filepaths"] = {}
-            config["filepaths"]["folder_format"] = "{albumartist} - {title} ({year})"
-            config["filepaths"]["track_format"] = "{tracknumber}. {artist} - {title}"
-            
-            # Write config
-            with open(self.config_path, "w") as f:
-                toml.dump(config, f)
+            await self.apply_config_patch({
+                "qobuz": qobuz,
+                # Ensure filepaths section has correct folder format (no [container] suffix)
+                "filepaths": {
+                    "folder_format": "{albumartist} - {title} ({year})",
+                    "track_format": "{tracknumber}. {artist} - {title}"
+                }
+            })
             
             return True
             
         except Exception as e:
-            print(f"Error updating streamrip config: {e}")
+            logger.error("Error updating streamrip config: %s", e)
             return False
     
     def _get_default_config(self) -> dict:
         """Get default streamrip configuration"""
-        return {
-            "downloads": {
-                "folder": "/music",
-                "source_subdirectories": False,
-                "disc_subdirectories": True,
-                "concurrency": True,
-                "max_connections": 6,
-                "requests_per_minute": -1
-            },
-            "qobuz": {
-                "quality": 1,
-                "download_booklets": True,
-                "use_auth_token": True,
-                "email_or_userid": "",
-                "password_or_token": "",
-                "app_id": "950096963",
-                "secrets": ["979549437fcc4a3faad4867b5cd25dcb"]
-            },
-            "tidal": {
-                "quality": 3,
-                "download_videos": True
-            },
-            "deezer": {
-                "quality": 2,
-                "deezloader_warnings": True
-            },
-            "soundcloud": {
-                "quality": 0
-            },
-            "youtube": {
-                "quality": 0,
-                "download_videos": False
-            },
-            "filepaths": {
-                "add_singles_to_folder": False,
-                "folder_format": "{albumartist} - {title} ({year})",
-                "track_format": "{tracknumber}. {artist} - {title}"
-            },
-            "artwork": {
-                "embed": True,
-                "embed_size": "large",
-                "embed_max_width": -1,
-                "save_artwork": True,
-                "saved_max_width": -1
-            },
-            "metadata": {
-                "set_playlist_to_album": True,
-                "exclude": []
-            },
-            "conversion": {
-                "enabled": False,
-                "codec": "MP3",
-                "sampling_rate": 48000,
-                "bit_depth": 24,
-                "lossy_bitrate": 320
-            },
-            "misc": {
-                "version": "2.0"
-            },
-            "cli": {
-                "text_output": True,
-                "progress_bars": True,
-                "max_search_results": 100
-            },
-            "database": {
-                "downloads_enabled": True,
-                "downloads_path": "/root/.config/streamrip/downloads.db",
-                "failed_downloads_enabled": True,
-                "failed_downloads_path": "/root/.config/streamrip/failed_downloads.db"
-            }
-        }
+        return copy.deepcopy(_DEFAULT_CONFIG)
     
     async def verify_credentials(self) -> Tuple[bool, str]:
         """Verify Qobuz credentials are working"""
         try:
-            # Try a simple search to verify credentials
-            process = await asyncio.create_subprocess_exec(
-                "rip", "search", "qobuz", "album", "test",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode == 0:
+            # Log in through streamrip's API on a worker process
+            success, error = await self._run_job({"action": "login"})
+            if success:
                 return True, "Credentials verified"
-            else:
-                return False, stderr.decode() or "Authentication failed"
-                
+            return False, error or "Authentication failed"
+            
         except Exception as e:
             return False, str(e)
     
     def get_config(self) -> Optional[dict]:
-        """Get current streamrip configuration"""
+        """Get current streamrip configuration (None if missing or unreadable)"""
+        # One stat when the file is unchanged - no exists() check, no reparse
         try:
-            if self.config_path.exists():
-                return toml.load(self.config_path)
-        except:
-            pass
-        return None
+            return self._load_config_cached()
+        except (OSError, tomllib.TOMLDecodeError):
+            return None
     
     async def download_to_path(self, url: str, output_path: str, quality: int = 1) -> bool:
         """
@@ -270,61 +419,10 @@ class StreamripService:
             # Ensure output directory exists
             os.makedirs(output_path, exist_ok=True)
             
-            # Save current config
-            original_config = None
-            if self.config_path.exists():
-                original_config = toml.load(self.config_path)
-            
-            # Update config with download path and quality
-            config = original_config.copy() if original_config else self._get_default_config()
-            
-            if "downloads" not in config:
-                config["downloads"] = {}
-            config["downloads"]["folder"] = output_path
-            
-            if "qobuz" not in config:
-                config["qobuz"] = {}
-            config["qobuz"]["quality"] = quality
-            
-            # Write temporary config
-            with open(self.config_path, "w") as f:
-                toml.dump(config, f)
-            
-            # Build streamrip command
-            cmd = ["rip", "-ndb", "url", url]
-            
-            print(f"Direct download: {' '.join(cmd)} (quality={quality})")
-            
-            # Execute streamrip
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            stdout_text = stdout.decode() if stdout else ""
-            stderr_text = stderr.decode() if stderr else ""
-            
-            print(f"Streamrip stdout: {stdout_text[:500]}")
-            if stderr_text:
-                print(f"Streamrip stderr: {stderr_text[:500]}")
-            
-            # Restore original config
-            if original_config:
-                with open(self.config_path, "w") as f:
-                    toml.dump(original_config, f)
+            logger.info("Direct download: %s (quality=%s)", url, quality)
             
-            return process.returncode == 0
+            return await self._rip([url], output_path, quality=quality)
             
         except Exception as e:
-            print(f"Direct download error: {e}")
-            # Try to restore original config
-            if original_config:
-                try:
-                    with open(self.config_path, "w") as f:
-                        toml.dump(original_config, f)
-                except:
-                    pass
+            logger.error("Direct download error: %s", e)
             return False
@@ -0,0 +1,37 @@
+from app.routers.search import merge_album_results
+from app.schemas.music import AlbumResponse
+
+
+def album(title: str, artist: str = "Led Zeppelin", qobuz_id: str = None) -> AlbumResponse:
+    return AlbumResponse(title=title, artist_name=artist, qobuz_id=qobuz_id)
+
+
+def merged_titles(local, remote):
+    return [a.title for a in merge_album_results(local, remote)]
+
+
+def test_numbered_sequels_are_not_hidden_by_local_album():
+    local = [album("Led Zeppelin")]
+    remote = [album("Led Zeppelin II", qobuz_id="2"), album("Led Zeppelin IV", qobuz_id="4")]
+    
+    assert merged_titles(local, remote) == ["Led Zeppelin", "Led Zeppelin II", "Led Zeppelin IV"]
+
+
+def test_volumes_are_not_hidden_by_local_album():
+    local = [album("Greatest Hits", artist="Queen")]
+    remote = [
+        album("Greatest Hits II", artist="Queen", qobuz_id="2"),
+        album("Greatest Hits III", artist="Queen", qobuz_id="3")
+    ]
+    
+    assert merged_titles(local, remote) == ["Greatest Hits", "Greatest Hits II", "Greatest Hits III"]
+
+
+def test_other_editions_of_local_album_are_hidden():
+    local = [album("Abbey Road", artist="The Beatles")]
+    remote = [
+        album("Abbey Road (2019 Remaster)", artist="The Beatles", qobuz_id="1"),
+        album("Abbey Road (Super Deluxe Edition)", artist="The Beatles", qobuz_id="2")
+    ]
+    
+    assert merged_titles(local, remote) == ["Abbey Road"]
@@ -2,7 +2,7 @@ import { useEffect, useRef, useState } from 'react'
 import { useDownloadStore } from '../stores/downloadStore'
 import { usePlayerStore } from '../stores/playerStore'
 import { Loader2, Download, CheckCircle } from 'lucide-react'
-import api from '../services/api'
+import api, { API_URL } from '../services/api'
 import toast from 'react-hot-toast'
 
 export default function DownloadBanner() {
@@ -12,7 +12,7 @@ export default function DownloadBanner() {
   const completedRef = useRef(new Set())
   const [completedDownloads, setCompletedDownloads] = useState(new Set())
   
-  // Poll for download completion
+  // Listen for download status changes pushed by the backend
   useEffect(() => {
     if (activeDownloads.length === 0) {
       if (pollingRef.current) {
@@ -22,11 +22,8 @@ export default function DownloadBanner() {
       return
     }
     
-    const checkDownloads = async () => {
+    const handleTasks = async (tasks) => {
       try {
-        const response = await api.get('/queue/downloads')
-        const tasks = response.data
-        
         // Check each active download against backend tasks
         for (const download of activeDownloads) {
           // Extract qobuz ID from download ID (format: download-{qobuzId})
@@ -65,16 +62,38 @@ export default function DownloadBanner() {
             }
           }
         }
+      } catch (error) {
+        console.error('Error handling download status:', error)
+      }
+    }
+    
+    const checkDownloads = async () => {
+      try {
+        const response = await api.get('/queue/downloads')
+        await handleTasks(response.data)
       } catch (error) {
         console.error('Error checking download status:', error)
       }
     }
     
-    // Check immediately and then every 3 seconds
-    checkDownloads()
-    pollingRef.current = setInterval(checkDownloads, 3000)
+    const wsBase = (API_URL || window.location.origin).replace(/^http/, 'ws')
+    const socket = new WebSocket(`${wsBase}/api/queue/downloads/ws`)
+    
+    // Catch up on anything that finished before the socket connected
+    socket.onopen = checkDownloads
+    socket.onmessage = (event) => handleTasks([JSON.parse(event.data)])
+    
+    // Fall back to polling every 3 seconds if the socket is unavailable
+    socket.onclose = () => {
+      if (!pollingRef.current) {
+        checkDownloads()
+        pollingRef.current = setInterval(checkDownloads, 3000)
+      }
+    }
     
     return () => {
+      socket.onclose = null
+      socket.close()
       if (pollingRef.current) {
         clearInterval(pollingRef.current)
         pollingRef.current = null
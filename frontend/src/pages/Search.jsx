@@ -31,6 +31,8 @@ export default function Search() {
       const response = await api.get('/search', {
         params: { q: searchQuery, include_remote: true }
       })
+      // 204 means a newer search from this client superseded this one
+      if (response.status === 204) return
       setResults(response.data)
     } catch (error) {
       console.error('Search failed:', error)